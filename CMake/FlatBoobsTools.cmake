@@ -5,9 +5,16 @@ function(flatboobs_add_schema target)
   find_package(Flatbuffers REQUIRED)
 
   # Parse args
-  set(options HEADER_ONLY SHARED)
-  cmake_parse_arguments(ARG "${options}" "" "" ${ARGN})
+  set(options HEADER_ONLY SHARED STATS PCH)
+  set(one_value_args LAYOUT UNITY_SIZE)
+  cmake_parse_arguments(ARG "${options}" "${one_value_args}" "" ${ARGN})
   set(schema_files ${ARG_UNPARSED_ARGUMENTS})
+  if(NOT ARG_LAYOUT)
+    set(ARG_LAYOUT schema)
+  endif()
+  if(NOT ARG_UNITY_SIZE)
+    set(ARG_UNITY_SIZE 0)
+  endif()
 
   # Get list of schema names
   execute_process(
@@ -26,24 +33,32 @@ function(flatboobs_add_schema target)
 
   ### C++ ###
 
-  # Make list of C++ headers and sources
-  set(header_files)
-  set(source_files)
-
-  foreach(schema ${schema_files})
-    string(REGEX REPLACE "^.*/([^/]+)\.fbs$" "\\1" name ${schema})
-    list(APPEND header_files ${output_dir}/include/${target}/${name}.hpp)
-    if(NOT ARG_HEADER_ONLY)
-      list(APPEND source_files ${output_dir}/src/${target}/${name}.cpp)
-    endif()
-  endforeach(schema)
-
   # Add command and target to generate C++ headers and sources
   if(ARG_HEADER_ONLY)
     set(boobs_args --header-only)
   else()
     set(boobs_args --no-header-only)
   endif()
+  list(APPEND boobs_args
+    --layout ${ARG_LAYOUT} --unity-size ${ARG_UNITY_SIZE})
+
+  # Make list of generated files, split layouts depend on schema content
+  execute_process(
+    COMMAND
+      ${Python_EXECUTABLE} -m flatboobs
+        cpp ${boobs_args} --list-outputs -o ${output_dir} ${target}
+        ${schema_files}
+    OUTPUT_VARIABLE
+      output_files
+    )
+  string(REPLACE "\n" ";" output_files "${output_files}")
+  set_property(DIRECTORY APPEND PROPERTY CMAKE_CONFIGURE_DEPENDS ${schema_files})
+
+  set(header_files ${output_files})
+  list(FILTER header_files INCLUDE REGEX "\\.hpp$")
+  set(source_files ${output_files})
+  list(FILTER source_files INCLUDE REGEX "\\.cpp$")
+
   add_custom_command(
     OUTPUT
       ${header_files}
@@ -76,6 +91,25 @@ function(flatboobs_add_schema target)
     target_include_directories(${target} PUBLIC ${output_dir}/include)
   endif()
   add_dependencies(${target} "${target}_generate")
+
+  # Precompiled header shared by split sources
+  if(ARG_PCH AND NOT ARG_HEADER_ONLY AND NOT ARG_LAYOUT STREQUAL "schema")
+    if(CMAKE_VERSION VERSION_LESS 3.16)
+      message(WARNING "Precompiled headers require CMake 3.16")
+    else()
+      target_precompile_headers(${target}
+        PRIVATE ${output_dir}/src/${target}/pch.hpp)
+    endif()
+  endif()
   target_link_libraries(${target} INTERFACE flatbuffers)
 
+  # Statistics have to be enabled for library and all its consumers
+  if(ARG_STATS)
+    if(ARG_HEADER_ONLY)
+      target_compile_definitions(${target} INTERFACE FLATBOOBS_ENABLE_STATS)
+    else()
+      target_compile_definitions(${target} PUBLIC FLATBOOBS_ENABLE_STATS)
+    endif()
+  endif()
+
 endfunction(flatboobs_add_schema)
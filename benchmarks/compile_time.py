@@ -0,0 +1,153 @@
+"""
+Measures compile time of generated C++ code for a synthetic schema
+with many tables, for every source layout.
+
+    python benchmarks/compile_time.py --tables 60 --namespaces 3 \\
+        -I include -I /usr/local/include
+
+Reports per layout: number of sources, total compile time, time of the
+slowest translation unit (critical path of parallel build), wall time
+with given number of jobs and time of consumer that includes
+the public header. Precompiling of shared header, if enabled,
+is added to total time and to critical path.
+"""
+# pylint: disable=missing-docstring
+
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import click
+
+LIBRARY = 'flatboobs_compile_time'
+SCALARS = ('byte', 'ubyte', 'short', 'ushort', 'int', 'uint', 'long', 'ulong',
+           'float', 'double', 'bool')
+COLUMNS = ('sources', 'total_s', 'max_tu_s', 'wall_s', 'consumer_s')
+
+
+def make_schema(tables: int, namespaces: int) -> Dict[str, str]:
+    """
+    Returns schema files by name. Vector item types have to be defined
+    in included file, they are kept in common.fbs.
+    """
+    common: List[str] = []
+    large: List[str] = ['include "common.fbs";', '']
+    per_namespace = max(1, tables // namespaces)
+    previous = ''
+    for i in range(tables):
+        if i % per_namespace == 0:
+            namespace = f'flatboobs.compile_time.ns{i // per_namespace}'
+            common += [f'namespace {namespace};', '',
+                       'enum Kind:ubyte { A, B, C }',
+                       'struct Point { x:float; y:float; z:float; }', '']
+            large += [f'namespace {namespace};', '']
+        fields = [f'  f{j}:{scalar};' for j, scalar in enumerate(SCALARS)]
+        fields += [f'  kind:{namespace}.Kind;', f'  point:{namespace}.Point;',
+                   '  ints:[int];', f'  points:[{namespace}.Point];']
+        if previous:
+            fields += [f'  child:{previous};']
+        large += [f'table Table{i:04} {{', *fields, '}', '']
+        previous = f'{namespace}.Table{i:04}'
+    large += [f'root_type {previous};']
+    return {'common.fbs': '\n'.join(common), 'large.fbs': '\n'.join(large)}
+
+
+def generate(
+        schema: Path, output_dir: Path, layout: str, unity_size: int,
+) -> None:
+    subprocess.run(
+        [sys.executable, '-m', 'flatboobs', 'cpp', '--no-clang-format',
+         '--layout', layout, '--unity-size', str(unity_size),
+         '-o', str(output_dir), LIBRARY, str(schema)],
+        check=True)
+
+
+def compile_source(
+        command: Sequence[str], source: Path, output: str = '/dev/null',
+) -> float:
+    start = time.perf_counter()
+    subprocess.run([*command, '-c', str(source), '-o', output], check=True)
+    return time.perf_counter() - start
+
+
+def measure(
+        output_dir: Path, command: Sequence[str], jobs: int, pch: bool,
+) -> Tuple[int, float, float, float, float]:
+    command = [*command, '-I', str(output_dir / 'include')]
+    consumer_command = command
+    sources = sorted((output_dir / 'src').rglob('*.cpp'))
+
+    start = time.perf_counter()
+    pch_time = 0.0
+    pch_header = output_dir / 'src' / LIBRARY / 'pch.hpp'
+    if pch and pch_header.exists():
+        pch_time = compile_source(
+            [*command, '-x', 'c++-header'], pch_header, f'{pch_header}.gch')
+        command = [*command, '-include', str(pch_header)]
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        times = list(executor.map(
+            lambda x: compile_source(command, x), sources))
+    wall = time.perf_counter() - start
+
+    consumer = output_dir / 'consumer.cpp'
+    consumer.write_text(f'#include <{LIBRARY}/large.hpp>\n')
+    consumer_time = compile_source(consumer_command, consumer)
+
+    return (len(sources), pch_time + sum(times), pch_time + max(times), wall,
+            consumer_time)
+
+
+@click.command(help="Measures compile time of generated code per layout.")
+@click.option('--tables', '-t', default=60, type=int,
+              help="Number of tables in synthetic schema.")
+@click.option('--namespaces', '-n', default=3, type=int,
+              help="Number of namespaces tables are spread over.")
+@click.option('--layout', '-l', 'layouts', multiple=True,
+              default=('schema', 'namespace', 'table'),
+              help="Layouts to measure.")
+@click.option('--unity-size', '-u', default=0, type=int,
+              help="Merge every N sources of split layouts.")
+@click.option('--pch/--no-pch', default=False,
+              help="Precompile shared header of split layouts.")
+@click.option('--jobs', '-j', default=1, type=int,
+              help="Number of parallel compiler processes.")
+@click.option('--cxx', default='c++ -std=c++17 -O2',
+              help="Compiler command.")
+@click.option('--include-path', '-I', multiple=True,
+              help="Include path of flatboobs and flatbuffers.")
+def main(
+        # pylint: disable=too-many-arguments
+        tables: int = 60,
+        namespaces: int = 3,
+        layouts: Sequence[str] = tuple(),
+        unity_size: int = 0,
+        pch: bool = False,
+        jobs: int = 1,
+        cxx: str = '',
+        include_path: Sequence[str] = tuple(),
+):
+    command = shlex.split(cxx) + [f'-I{x}' for x in include_path]
+    results: Dict[str, Tuple[int, float, float, float, float]] = dict()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, text in make_schema(tables, namespaces).items():
+            (Path(tmp) / name).write_text(text + '\n')
+        schema = Path(tmp) / 'large.fbs'
+        for layout in layouts:
+            output_dir = Path(tmp) / layout
+            generate(schema, output_dir, layout, unity_size)
+            results[layout] = measure(output_dir, command, jobs, pch)
+
+    click.echo('\t'.join(('# layout',) + COLUMNS))
+    for layout, values in results.items():
+        click.echo('\t'.join(
+            (layout, str(values[0]), *(f'{x:.2f}' for x in values[1:]))))
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
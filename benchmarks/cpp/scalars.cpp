@@ -0,0 +1,186 @@
+#include <benchmark/benchmark.h>
+#include <flatboobs_bench_schema/scalars.hpp>
+#include <scalars_generated.h>
+
+namespace fb = flatboobs::schema::test;
+namespace fc = flatc_gen::schema::test;
+
+/*
+ * Dataset
+ */
+
+static fb::TestScalars make_flatboobs() {
+  return fb::TestScalars{}.evolve(-1, -2, -3, -4, 1, 2, 3, 4, 1.5f, 2.5, false,
+                                  true);
+}
+
+static flatbuffers::Offset<fc::TestScalars>
+build_flatc(flatbuffers::FlatBufferBuilder &_fbb) {
+  fc::TestScalarsBuilder builder{_fbb};
+  builder.add_int_8(-1);
+  builder.add_int_16(-2);
+  builder.add_int_32(-3);
+  builder.add_int_64(-4);
+  builder.add_uint_8(1);
+  builder.add_uint_16(2);
+  builder.add_uint_32(3);
+  builder.add_uint_64(4);
+  builder.add_float_32(1.5f);
+  builder.add_float_64(2.5);
+  builder.add_bool_true(false);
+  builder.add_bool_false(true);
+  return builder.Finish();
+}
+
+static std::vector<uint8_t> pack_flatc() {
+  flatbuffers::FlatBufferBuilder fbb{1024};
+  fc::FinishTestScalarsBuffer(fbb, build_flatc(fbb));
+  return {fbb.GetBufferPointer(), fbb.GetBufferPointer() + fbb.GetSize()};
+}
+
+static bool verify_flatc(const std::vector<uint8_t> &_buffer) {
+  flatbuffers::Verifier verifier{_buffer.data(), _buffer.size()};
+  return fc::VerifyTestScalarsBuffer(verifier);
+}
+
+/*
+ * Pack
+ */
+
+static void BM_Scalars_Pack_FlatBoobs(benchmark::State &state) {
+  fb::TestScalars table = make_flatboobs();
+  for (auto _ : state) {
+    flatboobs::Message message = flatboobs::pack(table);
+    benchmark::DoNotOptimize(message.data());
+  }
+}
+BENCHMARK(BM_Scalars_Pack_FlatBoobs);
+
+static void BM_Scalars_Pack_FlatC(benchmark::State &state) {
+  for (auto _ : state) {
+    flatbuffers::FlatBufferBuilder fbb{1024};
+    fc::FinishTestScalarsBuffer(fbb, build_flatc(fbb));
+    benchmark::DoNotOptimize(fbb.GetBufferPointer());
+  }
+}
+BENCHMARK(BM_Scalars_Pack_FlatC);
+
+static void BM_Scalars_Pack_FlatCObject(benchmark::State &state) {
+  auto table = fc::UnPackTestScalars(pack_flatc().data());
+  for (auto _ : state) {
+    flatbuffers::FlatBufferBuilder fbb{1024};
+    fc::FinishTestScalarsBuffer(fbb, fc::CreateTestScalars(fbb, table.get()));
+    benchmark::DoNotOptimize(fbb.GetBufferPointer());
+  }
+}
+BENCHMARK(BM_Scalars_Pack_FlatCObject);
+
+/*
+ * Unpack and verify
+ */
+
+static void BM_Scalars_UnpackVerify_FlatBoobs(benchmark::State &state) {
+  flatboobs::Message message = flatboobs::pack(make_flatboobs());
+  for (auto _ : state) {
+    fb::TestScalars table = flatboobs::unpack<fb::TestScalars>(message);
+    benchmark::DoNotOptimize(table.int_8());
+  }
+}
+BENCHMARK(BM_Scalars_UnpackVerify_FlatBoobs);
+
+static void BM_Scalars_UnpackVerify_FlatC(benchmark::State &state) {
+  std::vector<uint8_t> buffer = pack_flatc();
+  for (auto _ : state) {
+    if (!verify_flatc(buffer))
+      state.SkipWithError("verification failed");
+    benchmark::DoNotOptimize(fc::GetTestScalars(buffer.data())->int_8());
+  }
+}
+BENCHMARK(BM_Scalars_UnpackVerify_FlatC);
+
+static void BM_Scalars_UnpackVerify_FlatCObject(benchmark::State &state) {
+  std::vector<uint8_t> buffer = pack_flatc();
+  for (auto _ : state) {
+    if (!verify_flatc(buffer))
+      state.SkipWithError("verification failed");
+    auto table = fc::UnPackTestScalars(buffer.data());
+    benchmark::DoNotOptimize(table->int_8);
+  }
+}
+BENCHMARK(BM_Scalars_UnpackVerify_FlatCObject);
+
+/*
+ * Field access
+ */
+
+static void BM_Scalars_Access_FlatBoobs(benchmark::State &state) {
+  fb::TestScalars table =
+      flatboobs::unpack<fb::TestScalars>(flatboobs::pack(make_flatboobs()));
+  for (auto _ : state) {
+    benchmark::DoNotOptimize(table.int_8() + table.int_32() + table.uint_64() +
+                             table.float_32() + table.float_64() +
+                             table.bool_false());
+  }
+}
+BENCHMARK(BM_Scalars_Access_FlatBoobs);
+
+static void BM_Scalars_Access_FlatC(benchmark::State &state) {
+  std::vector<uint8_t> buffer = pack_flatc();
+  const fc::TestScalars *table = fc::GetTestScalars(buffer.data());
+  for (auto _ : state) {
+    benchmark::DoNotOptimize(table->int_8() + table->int_32() +
+                             table->uint_64() + table->float_32() +
+                             table->float_64() + table->bool_false());
+  }
+}
+BENCHMARK(BM_Scalars_Access_FlatC);
+
+static void BM_Scalars_Access_FlatCObject(benchmark::State &state) {
+  auto table = fc::UnPackTestScalars(pack_flatc().data());
+  for (auto _ : state) {
+    benchmark::DoNotOptimize(table->int_8 + table->int_32 + table->uint_64 +
+                             table->float_32 + table->float_64 +
+                             table->bool_false);
+  }
+}
+BENCHMARK(BM_Scalars_Access_FlatCObject);
+
+/*
+ * Evolve and repack
+ */
+
+static void BM_Scalars_EvolveRepack_FlatBoobs(benchmark::State &state) {
+  fb::TestScalars table =
+      flatboobs::unpack<fb::TestScalars>(flatboobs::pack(make_flatboobs()));
+  for (auto _ : state) {
+    flatboobs::Message message = flatboobs::pack(
+        table.evolve({}, {}, table.int_32() + 1, {}, {}, {}, {}, {}, {}, {},
+                     {}, {}));
+    benchmark::DoNotOptimize(message.data());
+  }
+}
+BENCHMARK(BM_Scalars_EvolveRepack_FlatBoobs);
+
+static void BM_Scalars_EvolveRepack_FlatC(benchmark::State &state) {
+  std::vector<uint8_t> buffer = pack_flatc();
+  for (auto _ : state) {
+    std::vector<uint8_t> copy{buffer};
+    fc::TestScalars *table = fc::GetMutableTestScalars(copy.data());
+    if (!table->mutate_int_32(table->int_32() + 1))
+      state.SkipWithError("mutation failed");
+    benchmark::DoNotOptimize(copy.data());
+  }
+}
+BENCHMARK(BM_Scalars_EvolveRepack_FlatC);
+
+static void BM_Scalars_EvolveRepack_FlatCObject(benchmark::State &state) {
+  std::vector<uint8_t> buffer = pack_flatc();
+  for (auto _ : state) {
+    auto table = fc::UnPackTestScalars(buffer.data());
+    table->int_32 += 1;
+    flatbuffers::FlatBufferBuilder fbb{1024};
+    fc::FinishTestScalarsBuffer(fbb, fc::CreateTestScalars(fbb, table.get()));
+    benchmark::DoNotOptimize(fbb.GetBufferPointer());
+  }
+}
+BENCHMARK(BM_Scalars_EvolveRepack_FlatCObject);
@@ -0,0 +1,178 @@
+#include <benchmark/benchmark.h>
+#include <flatboobs_bench_schema/vecofscalars.hpp>
+#include <vecofscalars_generated.h>
+
+namespace fb = flatboobs::schema::test;
+namespace fc = flatc_gen::schema::test;
+
+/*
+ * Dataset
+ */
+
+static std::vector<int32_t> make_ints(size_t _size) {
+  std::vector<int32_t> ints{};
+  for (size_t i = 0; i < _size; i++)
+    ints.push_back(int32_t(i * 7 - _size));
+  return ints;
+}
+
+static std::vector<float> make_floats(size_t _size) {
+  std::vector<float> floats{};
+  for (size_t i = 0; i < _size; i++)
+    floats.push_back(float(i) / 3);
+  return floats;
+}
+
+static fb::TestVecOfScalars make_flatboobs(size_t _size) {
+  return fb::TestVecOfScalars{}.evolve(make_ints(_size), make_floats(_size),
+                                       {}, {});
+}
+
+static std::vector<uint8_t> pack_flatc(size_t _size) {
+  flatbuffers::FlatBufferBuilder fbb{1024};
+  std::vector<int32_t> ints = make_ints(_size);
+  std::vector<float> floats = make_floats(_size);
+  fc::FinishTestVecOfScalarsBuffer(
+      fbb, fc::CreateTestVecOfScalarsDirect(fbb, &ints, &floats));
+  return {fbb.GetBufferPointer(), fbb.GetBufferPointer() + fbb.GetSize()};
+}
+
+static bool verify_flatc(const std::vector<uint8_t> &_buffer) {
+  flatbuffers::Verifier verifier{_buffer.data(), _buffer.size()};
+  return fc::VerifyTestVecOfScalarsBuffer(verifier);
+}
+
+/*
+ * Pack
+ */
+
+static void BM_VecOfScalars_Pack_FlatBoobs(benchmark::State &state) {
+  fb::TestVecOfScalars table = make_flatboobs(state.range(0));
+  size_t size = 0;
+  for (auto _ : state) {
+    flatboobs::Message message = flatboobs::pack(table);
+    benchmark::DoNotOptimize(message.data());
+    size = message.size();
+  }
+  state.SetBytesProcessed(state.iterations() * size);
+}
+BENCHMARK(BM_VecOfScalars_Pack_FlatBoobs)->Range(8, 8 << 10);
+
+static void BM_VecOfScalars_Pack_FlatC(benchmark::State &state) {
+  std::vector<int32_t> ints = make_ints(state.range(0));
+  std::vector<float> floats = make_floats(state.range(0));
+  size_t size = 0;
+  for (auto _ : state) {
+    flatbuffers::FlatBufferBuilder fbb{1024};
+    fc::FinishTestVecOfScalarsBuffer(
+        fbb, fc::CreateTestVecOfScalarsDirect(fbb, &ints, &floats));
+    benchmark::DoNotOptimize(fbb.GetBufferPointer());
+    size = fbb.GetSize();
+  }
+  state.SetBytesProcessed(state.iterations() * size);
+}
+BENCHMARK(BM_VecOfScalars_Pack_FlatC)->Range(8, 8 << 10);
+
+static void BM_VecOfScalars_Pack_FlatCObject(benchmark::State &state) {
+  auto table = fc::UnPackTestVecOfScalars(pack_flatc(state.range(0)).data());
+  size_t size = 0;
+  for (auto _ : state) {
+    flatbuffers::FlatBufferBuilder fbb{1024};
+    fc::FinishTestVecOfScalarsBuffer(
+        fbb, fc::CreateTestVecOfScalars(fbb, table.get()));
+    benchmark::DoNotOptimize(fbb.GetBufferPointer());
+    size = fbb.GetSize();
+  }
+  state.SetBytesProcessed(state.iterations() * size);
+}
+BENCHMARK(BM_VecOfScalars_Pack_FlatCObject)->Range(8, 8 << 10);
+
+/*
+ * Unpack and verify
+ */
+
+static void BM_VecOfScalars_UnpackVerify_FlatBoobs(benchmark::State &state) {
+  flatboobs::Message message = flatboobs::pack(make_flatboobs(state.range(0)));
+  for (auto _ : state) {
+    fb::TestVecOfScalars table =
+        flatboobs::unpack<fb::TestVecOfScalars>(message);
+    benchmark::DoNotOptimize(table.ints().size());
+  }
+}
+BENCHMARK(BM_VecOfScalars_UnpackVerify_FlatBoobs)->Range(8, 8 << 10);
+
+static void BM_VecOfScalars_UnpackVerify_FlatC(benchmark::State &state) {
+  std::vector<uint8_t> buffer = pack_flatc(state.range(0));
+  for (auto _ : state) {
+    if (!verify_flatc(buffer))
+      state.SkipWithError("verification failed");
+    benchmark::DoNotOptimize(
+        fc::GetTestVecOfScalars(buffer.data())->ints()->size());
+  }
+}
+BENCHMARK(BM_VecOfScalars_UnpackVerify_FlatC)->Range(8, 8 << 10);
+
+static void BM_VecOfScalars_UnpackVerify_FlatCObject(benchmark::State &state) {
+  std::vector<uint8_t> buffer = pack_flatc(state.range(0));
+  for (auto _ : state) {
+    if (!verify_flatc(buffer))
+      state.SkipWithError("verification failed");
+    auto table = fc::UnPackTestVecOfScalars(buffer.data());
+    benchmark::DoNotOptimize(table->ints.size());
+  }
+}
+BENCHMARK(BM_VecOfScalars_UnpackVerify_FlatCObject)->Range(8, 8 << 10);
+
+/*
+ * Vector iteration
+ */
+
+static void BM_VecOfScalars_Iterate_FlatBoobs(benchmark::State &state) {
+  fb::TestVecOfScalars table = flatboobs::unpack<fb::TestVecOfScalars>(
+      flatboobs::pack(make_flatboobs(state.range(0))));
+  for (auto _ : state) {
+    int64_t ints = 0;
+    for (int32_t value : table.ints())
+      ints += value;
+    float floats = 0;
+    for (float value : table.floats())
+      floats += value;
+    benchmark::DoNotOptimize(ints);
+    benchmark::DoNotOptimize(floats);
+  }
+  state.SetItemsProcessed(state.iterations() * state.range(0) * 2);
+}
+BENCHMARK(BM_VecOfScalars_Iterate_FlatBoobs)->Range(8, 8 << 10);
+
+static void BM_VecOfScalars_Iterate_FlatC(benchmark::State &state) {
+  std::vector<uint8_t> buffer = pack_flatc(state.range(0));
+  const fc::TestVecOfScalars *table = fc::GetTestVecOfScalars(buffer.data());
+  for (auto _ : state) {
+    int64_t ints = 0;
+    for (int32_t value : *table->ints())
+      ints += value;
+    float floats = 0;
+    for (float value : *table->floats())
+      floats += value;
+    benchmark::DoNotOptimize(ints);
+    benchmark::DoNotOptimize(floats);
+  }
+  state.SetItemsProcessed(state.iterations() * state.range(0) * 2);
+}
+BENCHMARK(BM_VecOfScalars_Iterate_FlatC)->Range(8, 8 << 10);
+
+static void BM_VecOfScalars_Iterate_FlatCObject(benchmark::State &state) {
+  auto table = fc::UnPackTestVecOfScalars(pack_flatc(state.range(0)).data());
+  for (auto _ : state) {
+    int64_t ints = 0;
+    for (int32_t value : table->ints)
+      ints += value;
+    float floats = 0;
+    for (float value : table->floats)
+      floats += value;
+    benchmark::DoNotOptimize(ints);
+    benchmark::DoNotOptimize(floats);
+  }
+  state.SetItemsProcessed(state.iterations() * state.range(0) * 2);
+}
+BENCHMARK(BM_VecOfScalars_Iterate_FlatCObject)->Range(8, 8 << 10);
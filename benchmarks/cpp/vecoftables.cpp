@@ -0,0 +1,209 @@
+#include <benchmark/benchmark.h>
+#include <flatboobs_bench_schema/vecoftables.hpp>
+#include <vecoftables_generated.h>
+
+namespace fb = flatboobs::schema::test;
+namespace fc = flatc_gen::schema::test;
+
+/*
+ * Dataset
+ */
+
+static fb::TestVecOfTables make_flatboobs(size_t _size) {
+  std::vector<fb::TestTable> tables{};
+  for (size_t i = 0; i < _size; i++)
+    tables.push_back(fb::TestTable{}.evolve(
+        uint8_t(i), float(i) / 2, static_cast<fb::TestEnum>(i % 2)));
+  return fb::TestVecOfTables{}.evolve(tables);
+}
+
+static flatbuffers::Offset<fc::TestVecOfTables>
+build_flatc(flatbuffers::FlatBufferBuilder &_fbb, size_t _size) {
+  std::vector<flatbuffers::Offset<fc::TestTable>> tables{};
+  for (size_t i = 0; i < _size; i++)
+    tables.push_back(fc::CreateTestTable(_fbb, uint8_t(i), float(i) / 2,
+                                         static_cast<fc::TestEnum>(i % 2)));
+  return fc::CreateTestVecOfTables(_fbb, _fbb.CreateVector(tables));
+}
+
+static std::vector<uint8_t> pack_flatc(size_t _size) {
+  flatbuffers::FlatBufferBuilder fbb{1024};
+  fc::FinishTestVecOfTablesBuffer(fbb, build_flatc(fbb, _size));
+  return {fbb.GetBufferPointer(), fbb.GetBufferPointer() + fbb.GetSize()};
+}
+
+static bool verify_flatc(const std::vector<uint8_t> &_buffer) {
+  flatbuffers::Verifier verifier{_buffer.data(), _buffer.size()};
+  return fc::VerifyTestVecOfTablesBuffer(verifier);
+}
+
+/*
+ * Pack
+ */
+
+static void BM_VecOfTables_Pack_FlatBoobs(benchmark::State &state) {
+  fb::TestVecOfTables table = make_flatboobs(state.range(0));
+  for (auto _ : state) {
+    flatboobs::Message message = flatboobs::pack(table);
+    benchmark::DoNotOptimize(message.data());
+  }
+  state.SetItemsProcessed(state.iterations() * state.range(0));
+}
+BENCHMARK(BM_VecOfTables_Pack_FlatBoobs)->Range(8, 1 << 10);
+
+static void BM_VecOfTables_Pack_FlatC(benchmark::State &state) {
+  for (auto _ : state) {
+    flatbuffers::FlatBufferBuilder fbb{1024};
+    fc::FinishTestVecOfTablesBuffer(fbb, build_flatc(fbb, state.range(0)));
+    benchmark::DoNotOptimize(fbb.GetBufferPointer());
+  }
+  state.SetItemsProcessed(state.iterations() * state.range(0));
+}
+BENCHMARK(BM_VecOfTables_Pack_FlatC)->Range(8, 1 << 10);
+
+static void BM_VecOfTables_Pack_FlatCObject(benchmark::State &state) {
+  auto table = fc::UnPackTestVecOfTables(pack_flatc(state.range(0)).data());
+  for (auto _ : state) {
+    flatbuffers::FlatBufferBuilder fbb{1024};
+    fc::FinishTestVecOfTablesBuffer(
+        fbb, fc::CreateTestVecOfTables(fbb, table.get()));
+    benchmark::DoNotOptimize(fbb.GetBufferPointer());
+  }
+  state.SetItemsProcessed(state.iterations() * state.range(0));
+}
+BENCHMARK(BM_VecOfTables_Pack_FlatCObject)->Range(8, 1 << 10);
+
+/*
+ * Unpack and verify
+ */
+
+static void BM_VecOfTables_UnpackVerify_FlatBoobs(benchmark::State &state) {
+  flatboobs::Message message = flatboobs::pack(make_flatboobs(state.range(0)));
+  for (auto _ : state) {
+    fb::TestVecOfTables table = flatboobs::unpack<fb::TestVecOfTables>(message);
+    benchmark::DoNotOptimize(table.tables().size());
+  }
+  state.SetItemsProcessed(state.iterations() * state.range(0));
+}
+BENCHMARK(BM_VecOfTables_UnpackVerify_FlatBoobs)->Range(8, 1 << 10);
+
+static void BM_VecOfTables_UnpackVerify_FlatC(benchmark::State &state) {
+  std::vector<uint8_t> buffer = pack_flatc(state.range(0));
+  for (auto _ : state) {
+    if (!verify_flatc(buffer))
+      state.SkipWithError("verification failed");
+    benchmark::DoNotOptimize(
+        fc::GetTestVecOfTables(buffer.data())->tables()->size());
+  }
+  state.SetItemsProcessed(state.iterations() * state.range(0));
+}
+BENCHMARK(BM_VecOfTables_UnpackVerify_FlatC)->Range(8, 1 << 10);
+
+static void BM_VecOfTables_UnpackVerify_FlatCObject(benchmark::State &state) {
+  std::vector<uint8_t> buffer = pack_flatc(state.range(0));
+  for (auto _ : state) {
+    if (!verify_flatc(buffer))
+      state.SkipWithError("verification failed");
+    auto table = fc::UnPackTestVecOfTables(buffer.data());
+    benchmark::DoNotOptimize(table->tables.size());
+  }
+  state.SetItemsProcessed(state.iterations() * state.range(0));
+}
+BENCHMARK(BM_VecOfTables_UnpackVerify_FlatCObject)->Range(8, 1 << 10);
+
+/*
+ * Vector iteration
+ */
+
+static void BM_VecOfTables_Iterate_FlatBoobs(benchmark::State &state) {
+  fb::TestVecOfTables table = flatboobs::unpack<fb::TestVecOfTables>(
+      flatboobs::pack(make_flatboobs(state.range(0))));
+  for (auto _ : state) {
+    float sum = 0;
+    for (fb::TestTable item : table.tables())
+      sum += item.a() + item.b();
+    benchmark::DoNotOptimize(sum);
+  }
+  state.SetItemsProcessed(state.iterations() * state.range(0));
+}
+BENCHMARK(BM_VecOfTables_Iterate_FlatBoobs)->Range(8, 1 << 10);
+
+static void BM_VecOfTables_Iterate_FlatC(benchmark::State &state) {
+  std::vector<uint8_t> buffer = pack_flatc(state.range(0));
+  const fc::TestVecOfTables *table = fc::GetTestVecOfTables(buffer.data());
+  for (auto _ : state) {
+    float sum = 0;
+    for (const fc::TestTable *item : *table->tables())
+      sum += item->a() + item->b();
+    benchmark::DoNotOptimize(sum);
+  }
+  state.SetItemsProcessed(state.iterations() * state.range(0));
+}
+BENCHMARK(BM_VecOfTables_Iterate_FlatC)->Range(8, 1 << 10);
+
+static void BM_VecOfTables_Iterate_FlatCObject(benchmark::State &state) {
+  auto table = fc::UnPackTestVecOfTables(pack_flatc(state.range(0)).data());
+  for (auto _ : state) {
+    float sum = 0;
+    for (const auto &item : table->tables)
+      sum += item->a + item->b;
+    benchmark::DoNotOptimize(sum);
+  }
+  state.SetItemsProcessed(state.iterations() * state.range(0));
+}
+BENCHMARK(BM_VecOfTables_Iterate_FlatCObject)->Range(8, 1 << 10);
+
+/*
+ * Evolve and repack
+ *
+ * Appends one table. Flatc raw API has to rebuild the whole vector.
+ */
+
+static void BM_VecOfTables_EvolveRepack_FlatBoobs(benchmark::State &state) {
+  fb::TestVecOfTables table = flatboobs::unpack<fb::TestVecOfTables>(
+      flatboobs::pack(make_flatboobs(state.range(0))));
+  for (auto _ : state) {
+    std::vector<fb::TestTable> tables{};
+    tables.reserve(state.range(0) + 1);
+    for (fb::TestTable item : table.tables())
+      tables.push_back(item);
+    tables.push_back(fb::TestTable{});
+    flatboobs::Message message = flatboobs::pack(table.evolve(tables));
+    benchmark::DoNotOptimize(message.data());
+  }
+  state.SetItemsProcessed(state.iterations() * state.range(0));
+}
+BENCHMARK(BM_VecOfTables_EvolveRepack_FlatBoobs)->Range(8, 1 << 10);
+
+static void BM_VecOfTables_EvolveRepack_FlatC(benchmark::State &state) {
+  std::vector<uint8_t> buffer = pack_flatc(state.range(0));
+  const fc::TestVecOfTables *table = fc::GetTestVecOfTables(buffer.data());
+  for (auto _ : state) {
+    flatbuffers::FlatBufferBuilder fbb{1024};
+    std::vector<flatbuffers::Offset<fc::TestTable>> tables{};
+    tables.reserve(state.range(0) + 1);
+    for (const fc::TestTable *item : *table->tables())
+      tables.push_back(
+          fc::CreateTestTable(fbb, item->a(), item->b(), item->e()));
+    tables.push_back(fc::CreateTestTable(fbb));
+    fc::FinishTestVecOfTablesBuffer(
+        fbb, fc::CreateTestVecOfTables(fbb, fbb.CreateVector(tables)));
+    benchmark::DoNotOptimize(fbb.GetBufferPointer());
+  }
+  state.SetItemsProcessed(state.iterations() * state.range(0));
+}
+BENCHMARK(BM_VecOfTables_EvolveRepack_FlatC)->Range(8, 1 << 10);
+
+static void BM_VecOfTables_EvolveRepack_FlatCObject(benchmark::State &state) {
+  std::vector<uint8_t> buffer = pack_flatc(state.range(0));
+  for (auto _ : state) {
+    auto table = fc::UnPackTestVecOfTables(buffer.data());
+    table->tables.push_back(std::make_unique<fc::TestTableT>());
+    flatbuffers::FlatBufferBuilder fbb{1024};
+    fc::FinishTestVecOfTablesBuffer(
+        fbb, fc::CreateTestVecOfTables(fbb, table.get()));
+    benchmark::DoNotOptimize(fbb.GetBufferPointer());
+  }
+  state.SetItemsProcessed(state.iterations() * state.range(0));
+}
+BENCHMARK(BM_VecOfTables_EvolveRepack_FlatCObject)->Range(8, 1 << 10);
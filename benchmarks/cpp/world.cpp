@@ -0,0 +1,342 @@
+#include <benchmark/benchmark.h>
+#include <flatboobs_bench_schema/world.hpp>
+#include <world_generated.h>
+
+namespace fb = flatboobs::schema::bench;
+namespace fc = flatc_gen::schema::bench;
+
+/*
+ * Dataset
+ */
+
+struct MonsterData {
+  uint64_t id;
+  float pos[3];
+  float velocity[3];
+  int16_t mana;
+  int16_t hp;
+  uint8_t color;
+  bool friendly;
+  std::vector<uint8_t> inventory;
+  std::vector<std::array<float, 3>> path;
+  std::vector<std::tuple<int16_t, float, uint32_t>> weapons;
+};
+
+struct WorldData {
+  uint64_t tick;
+  uint32_t seed;
+  float gravity;
+  std::vector<MonsterData> monsters;
+  std::vector<float> heightmap;
+};
+
+static WorldData make_data(size_t _monsters) {
+  WorldData data{1000, 42, -9.81f, {}, {}};
+  for (size_t i = 0; i < _monsters; i++) {
+    MonsterData monster{i + 1,
+                        {float(i), float(i) * 2, float(i) * 3},
+                        {0.5f, -0.5f, 0.25f},
+                        int16_t(i % 300),
+                        int16_t(100 + i % 7),
+                        uint8_t(i % 3),
+                        i % 2 == 0,
+                        {},
+                        {},
+                        {}};
+    for (size_t j = 0; j < 32; j++)
+      monster.inventory.push_back(uint8_t(i + j));
+    for (size_t j = 0; j < 16; j++)
+      monster.path.push_back({float(j), float(i), float(i + j)});
+    for (size_t j = 0; j < 3; j++)
+      monster.weapons.emplace_back(int16_t(10 * j + 1), 1.5f * j,
+                                   uint32_t(100 + j));
+    data.monsters.push_back(std::move(monster));
+  }
+  for (size_t i = 0; i < 1024; i++)
+    data.heightmap.push_back(float(i % 64) / 8);
+  return data;
+}
+
+static fb::World make_flatboobs(const WorldData &_data) {
+  std::vector<fb::Monster> monsters{};
+  for (const MonsterData &m : _data.monsters) {
+    std::vector<fb::Vec3> path{};
+    for (const auto &p : m.path)
+      path.push_back(fb::Vec3(p[0], p[1], p[2]));
+    std::vector<fb::Weapon> weapons{};
+    for (const auto &[damage, range, ammo] : m.weapons)
+      weapons.push_back(fb::Weapon{}.evolve(damage, range, ammo));
+    monsters.push_back(fb::Monster{}.evolve(
+        m.id, fb::Vec3(m.pos[0], m.pos[1], m.pos[2]),
+        fb::Vec3(m.velocity[0], m.velocity[1], m.velocity[2]), m.mana, m.hp,
+        static_cast<fb::Color>(m.color), m.friendly, m.inventory, path,
+        weapons, weapons.front()));
+  }
+  return fb::World{}.evolve(_data.tick, _data.seed, _data.gravity, monsters,
+                            _data.heightmap);
+}
+
+static flatbuffers::Offset<fc::World>
+build_flatc(flatbuffers::FlatBufferBuilder &_fbb, const WorldData &_data) {
+  std::vector<flatbuffers::Offset<fc::Monster>> monsters{};
+  for (const MonsterData &m : _data.monsters) {
+    fc::Vec3 *path = nullptr;
+    auto path_offset = _fbb.CreateUninitializedVectorOfStructs(m.path.size(),
+                                                               &path);
+    for (const auto &p : m.path)
+      *path++ = fc::Vec3(p[0], p[1], p[2]);
+    std::vector<flatbuffers::Offset<fc::Weapon>> weapons{};
+    for (const auto &[damage, range, ammo] : m.weapons)
+      weapons.push_back(fc::CreateWeapon(_fbb, damage, range, ammo));
+    // equipped weapon is shared with weapons, same as flatboobs dataset
+    auto equipped = weapons.front();
+    fc::Vec3 pos(m.pos[0], m.pos[1], m.pos[2]);
+    fc::Vec3 velocity(m.velocity[0], m.velocity[1], m.velocity[2]);
+    monsters.push_back(fc::CreateMonster(
+        _fbb, m.id, &pos, &velocity, m.mana, m.hp,
+        static_cast<fc::Color>(m.color), m.friendly,
+        _fbb.CreateVector(m.inventory), path_offset,
+        _fbb.CreateVector(weapons), equipped));
+  }
+  return fc::CreateWorld(_fbb, _data.tick, _data.seed, _data.gravity,
+                         _fbb.CreateVector(monsters),
+                         _fbb.CreateVector(_data.heightmap));
+}
+
+static std::vector<uint8_t> pack_flatc(const WorldData &_data) {
+  flatbuffers::FlatBufferBuilder fbb{1024};
+  fc::FinishWorldBuffer(fbb, build_flatc(fbb, _data));
+  return {fbb.GetBufferPointer(), fbb.GetBufferPointer() + fbb.GetSize()};
+}
+
+static bool verify_flatc(const std::vector<uint8_t> &_buffer) {
+  flatbuffers::Verifier verifier{_buffer.data(), _buffer.size()};
+  return fc::VerifyWorldBuffer(verifier);
+}
+
+/*
+ * Pack
+ */
+
+static void BM_World_Pack_FlatBoobs(benchmark::State &state) {
+  fb::World world = make_flatboobs(make_data(state.range(0)));
+  size_t size = 0;
+  for (auto _ : state) {
+    flatboobs::Message message = flatboobs::pack(world);
+    benchmark::DoNotOptimize(message.data());
+    size = message.size();
+  }
+  state.counters["size"] = size;
+  state.SetBytesProcessed(state.iterations() * size);
+}
+BENCHMARK(BM_World_Pack_FlatBoobs)->Arg(16)->Arg(256);
+
+static void BM_World_Pack_FlatC(benchmark::State &state) {
+  WorldData data = make_data(state.range(0));
+  size_t size = 0;
+  for (auto _ : state) {
+    flatbuffers::FlatBufferBuilder fbb{1024};
+    fc::FinishWorldBuffer(fbb, build_flatc(fbb, data));
+    benchmark::DoNotOptimize(fbb.GetBufferPointer());
+    size = fbb.GetSize();
+  }
+  state.counters["size"] = size;
+  state.SetBytesProcessed(state.iterations() * size);
+}
+BENCHMARK(BM_World_Pack_FlatC)->Arg(16)->Arg(256);
+
+static void BM_World_Pack_FlatCObject(benchmark::State &state) {
+  auto world = fc::UnPackWorld(pack_flatc(make_data(state.range(0))).data());
+  size_t size = 0;
+  for (auto _ : state) {
+    flatbuffers::FlatBufferBuilder fbb{1024};
+    fc::FinishWorldBuffer(fbb, fc::CreateWorld(fbb, world.get()));
+    benchmark::DoNotOptimize(fbb.GetBufferPointer());
+    size = fbb.GetSize();
+  }
+  state.counters["size"] = size;
+  state.SetBytesProcessed(state.iterations() * size);
+}
+BENCHMARK(BM_World_Pack_FlatCObject)->Arg(16)->Arg(256);
+
+/*
+ * Unpack and verify
+ */
+
+static void BM_World_UnpackVerify_FlatBoobs(benchmark::State &state) {
+  flatboobs::Message message =
+      flatboobs::pack(make_flatboobs(make_data(state.range(0))));
+  for (auto _ : state) {
+    fb::World world = flatboobs::unpack<fb::World>(message);
+    benchmark::DoNotOptimize(world.tick());
+  }
+  state.SetBytesProcessed(state.iterations() * message.size());
+}
+BENCHMARK(BM_World_UnpackVerify_FlatBoobs)->Arg(16)->Arg(256);
+
+static void BM_World_UnpackVerify_FlatC(benchmark::State &state) {
+  std::vector<uint8_t> buffer = pack_flatc(make_data(state.range(0)));
+  for (auto _ : state) {
+    if (!verify_flatc(buffer))
+      state.SkipWithError("verification failed");
+    benchmark::DoNotOptimize(fc::GetWorld(buffer.data())->tick());
+  }
+  state.SetBytesProcessed(state.iterations() * buffer.size());
+}
+BENCHMARK(BM_World_UnpackVerify_FlatC)->Arg(16)->Arg(256);
+
+static void BM_World_UnpackVerify_FlatCObject(benchmark::State &state) {
+  std::vector<uint8_t> buffer = pack_flatc(make_data(state.range(0)));
+  for (auto _ : state) {
+    if (!verify_flatc(buffer))
+      state.SkipWithError("verification failed");
+    auto world = fc::UnPackWorld(buffer.data());
+    benchmark::DoNotOptimize(world->tick);
+  }
+  state.SetBytesProcessed(state.iterations() * buffer.size());
+}
+BENCHMARK(BM_World_UnpackVerify_FlatCObject)->Arg(16)->Arg(256);
+
+/*
+ * Field access
+ */
+
+static void BM_World_Access_FlatBoobs(benchmark::State &state) {
+  fb::World world = flatboobs::unpack<fb::World>(
+      flatboobs::pack(make_flatboobs(make_data(state.range(0)))));
+  for (auto _ : state) {
+    fb::Monster monster = world.monsters()[state.range(0) / 2];
+    benchmark::DoNotOptimize(world.tick() + world.seed() + monster.id() +
+                             monster.hp() + monster.pos().y() +
+                             monster.equipped().ammo());
+  }
+}
+BENCHMARK(BM_World_Access_FlatBoobs)->Arg(16)->Arg(256);
+
+static void BM_World_Access_FlatC(benchmark::State &state) {
+  std::vector<uint8_t> buffer = pack_flatc(make_data(state.range(0)));
+  const fc::World *world = fc::GetWorld(buffer.data());
+  for (auto _ : state) {
+    const fc::Monster *monster = world->monsters()->Get(state.range(0) / 2);
+    benchmark::DoNotOptimize(world->tick() + world->seed() + monster->id() +
+                             monster->hp() + monster->pos()->y() +
+                             monster->equipped()->ammo());
+  }
+}
+BENCHMARK(BM_World_Access_FlatC)->Arg(16)->Arg(256);
+
+static void BM_World_Access_FlatCObject(benchmark::State &state) {
+  auto world = fc::UnPackWorld(pack_flatc(make_data(state.range(0))).data());
+  for (auto _ : state) {
+    const fc::MonsterT &monster = *world->monsters[state.range(0) / 2];
+    benchmark::DoNotOptimize(world->tick + world->seed + monster.id +
+                             monster.hp + monster.pos->y() +
+                             monster.equipped->ammo);
+  }
+}
+BENCHMARK(BM_World_Access_FlatCObject)->Arg(16)->Arg(256);
+
+/*
+ * Vector iteration
+ */
+
+static void BM_World_Iterate_FlatBoobs(benchmark::State &state) {
+  fb::World world = flatboobs::unpack<fb::World>(
+      flatboobs::pack(make_flatboobs(make_data(state.range(0)))));
+  for (auto _ : state) {
+    float sum = 0;
+    for (fb::Monster monster : world.monsters()) {
+      sum += monster.hp();
+      for (const fb::Vec3 &point : monster.path())
+        sum += point.x();
+      for (fb::Weapon weapon : monster.weapons())
+        sum += weapon.damage();
+    }
+    for (float height : world.heightmap())
+      sum += height;
+    benchmark::DoNotOptimize(sum);
+  }
+  state.SetItemsProcessed(state.iterations() * state.range(0));
+}
+BENCHMARK(BM_World_Iterate_FlatBoobs)->Arg(16)->Arg(256);
+
+static void BM_World_Iterate_FlatC(benchmark::State &state) {
+  std::vector<uint8_t> buffer = pack_flatc(make_data(state.range(0)));
+  const fc::World *world = fc::GetWorld(buffer.data());
+  for (auto _ : state) {
+    float sum = 0;
+    for (const fc::Monster *monster : *world->monsters()) {
+      sum += monster->hp();
+      for (const fc::Vec3 *point : *monster->path())
+        sum += point->x();
+      for (const fc::Weapon *weapon : *monster->weapons())
+        sum += weapon->damage();
+    }
+    for (float height : *world->heightmap())
+      sum += height;
+    benchmark::DoNotOptimize(sum);
+  }
+  state.SetItemsProcessed(state.iterations() * state.range(0));
+}
+BENCHMARK(BM_World_Iterate_FlatC)->Arg(16)->Arg(256);
+
+static void BM_World_Iterate_FlatCObject(benchmark::State &state) {
+  auto world = fc::UnPackWorld(pack_flatc(make_data(state.range(0))).data());
+  for (auto _ : state) {
+    float sum = 0;
+    for (const auto &monster : world->monsters) {
+      sum += monster->hp;
+      for (const fc::Vec3 &point : monster->path)
+        sum += point.x();
+      for (const auto &weapon : monster->weapons)
+        sum += weapon->damage;
+    }
+    for (float height : world->heightmap)
+      sum += height;
+    benchmark::DoNotOptimize(sum);
+  }
+  state.SetItemsProcessed(state.iterations() * state.range(0));
+}
+BENCHMARK(BM_World_Iterate_FlatCObject)->Arg(16)->Arg(256);
+
+/*
+ * Evolve and repack
+ *
+ * Flatc generated code has no evolve, closest equivalents are in-place
+ * mutation of a copy (raw API) and unpack-modify-pack (object API).
+ */
+
+static void BM_World_EvolveRepack_FlatBoobs(benchmark::State &state) {
+  fb::World world = flatboobs::unpack<fb::World>(
+      flatboobs::pack(make_flatboobs(make_data(state.range(0)))));
+  for (auto _ : state) {
+    flatboobs::Message message =
+        flatboobs::pack(world.evolve(world.tick() + 1, {}, {}, {}, {}));
+    benchmark::DoNotOptimize(message.data());
+  }
+}
+BENCHMARK(BM_World_EvolveRepack_FlatBoobs)->Arg(16)->Arg(256);
+
+static void BM_World_EvolveRepack_FlatC(benchmark::State &state) {
+  std::vector<uint8_t> buffer = pack_flatc(make_data(state.range(0)));
+  for (auto _ : state) {
+    std::vector<uint8_t> copy{buffer};
+    fc::World *world = fc::GetMutableWorld(copy.data());
+    if (!world->mutate_tick(world->tick() + 1))
+      state.SkipWithError("mutation failed");
+    benchmark::DoNotOptimize(copy.data());
+  }
+}
+BENCHMARK(BM_World_EvolveRepack_FlatC)->Arg(16)->Arg(256);
+
+static void BM_World_EvolveRepack_FlatCObject(benchmark::State &state) {
+  std::vector<uint8_t> buffer = pack_flatc(make_data(state.range(0)));
+  for (auto _ : state) {
+    auto world = fc::UnPackWorld(buffer.data());
+    world->tick += 1;
+    flatbuffers::FlatBufferBuilder fbb{1024};
+    fc::FinishWorldBuffer(fbb, fc::CreateWorld(fbb, world.get()));
+    benchmark::DoNotOptimize(fbb.GetBufferPointer());
+  }
+}
+BENCHMARK(BM_World_EvolveRepack_FlatCObject)->Arg(16)->Arg(256);
@@ -0,0 +1,128 @@
+"""
+Runs benchmark executable and writes results in diffable form:
+one benchmark per line, sorted by name, values rounded
+to three significant digits.
+
+    python benchmarks/run.py build/benchmarks/cpp/flatboobs_benchmark \\
+        -o results.tsv --baseline old_results.tsv
+"""
+# pylint: disable=missing-docstring
+
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Optional, TextIO
+
+import click
+
+COLUMNS = ('cpu_time_ns', 'items_per_second', 'bytes_per_second', 'size')
+
+Results = Dict[str, Dict[str, float]]
+
+
+def round_significant(value: float, digits: int = 3) -> float:
+    return float(f'{value:.{digits}g}')
+
+
+def sort_key(name: str):
+    """
+    Orders ``BM_X/8`` before ``BM_X/64``.
+    """
+    return [int(x) if x.isdigit() else x for x in re.split(r'(\d+)', name)]
+
+
+def run_benchmarks(
+        binary: str, benchmark_filter: str, repetitions: int,
+) -> Results:
+    command = [binary, '--benchmark_format=json',
+               f'--benchmark_filter={benchmark_filter}']
+    if repetitions > 1:
+        command += [f'--benchmark_repetitions={repetitions}',
+                    '--benchmark_report_aggregates_only=true']
+    output = subprocess.run(
+        command, check=True, stdout=subprocess.PIPE).stdout
+    report = json.loads(output)
+
+    results: Results = dict()
+    for item in report['benchmarks']:
+        if repetitions > 1 and item.get('aggregate_name') != 'median':
+            continue
+        name = item.get('run_name', item['name'])
+        scale = {'ns': 1, 'us': 1e3, 'ms': 1e6, 's': 1e9}[item['time_unit']]
+        results[name] = {
+            'cpu_time_ns': item['cpu_time'] * scale,
+            'items_per_second': item.get('items_per_second', 0),
+            'bytes_per_second': item.get('bytes_per_second', 0),
+            'size': item.get('size', 0),
+        }
+    return results
+
+
+def write_results(results: Results, stream: TextIO) -> None:
+    stream.write('\t'.join(('# name',) + COLUMNS) + '\n')
+    for name in sorted(results, key=sort_key):
+        values = (f'{round_significant(results[name][x]):g}' for x in COLUMNS)
+        stream.write('\t'.join((name, *values)) + '\n')
+
+
+def read_results(path: Path) -> Results:
+    results: Results = dict()
+    with path.open() as stream:
+        for line in stream:
+            if line.startswith('#') or not line.strip():
+                continue
+            name, *values = line.rstrip('\n').split('\t')
+            results[name] = dict(zip(COLUMNS, map(float, values)))
+    return results
+
+
+def write_comparison(
+        baseline: Results, results: Results, stream: TextIO) -> None:
+    stream.write('# name\tbaseline_ns\tcpu_time_ns\tratio\n')
+    for name in sorted(set(baseline) & set(results), key=sort_key):
+        old = baseline[name]['cpu_time_ns']
+        new = round_significant(results[name]['cpu_time_ns'])
+        ratio = new / old if old else float('nan')
+        stream.write(f'{name}\t{old:g}\t{new:g}\t{ratio:.2f}\n')
+
+
+@click.command(help="Runs benchmarks and writes diffable results.")
+@click.option(
+    '--output', '-o', default=None,
+    type=click.Path(dir_okay=False, writable=True),
+    help="Results file, stdout by default.")
+@click.option(
+    '--baseline', '-b', default=None,
+    type=click.Path(exists=True, dir_okay=False, readable=True),
+    help="Results file of previous run to compare with.")
+@click.option(
+    '--filter', '-f', 'benchmark_filter', default='.',
+    help="Regular expression passed to --benchmark_filter.")
+@click.option(
+    '--repetitions', '-r', default=3, type=int,
+    help="Number of repetitions, median is reported.")
+@click.argument(
+    'binary', type=click.Path(exists=True, dir_okay=False))
+def main(
+        output: Optional[str] = None,
+        baseline: Optional[str] = None,
+        benchmark_filter: str = '.',
+        repetitions: int = 3,
+        binary: str = '',
+):
+    results = run_benchmarks(binary, benchmark_filter, repetitions)
+
+    if output:
+        with open(output, 'w') as stream:
+            write_results(results, stream)
+    else:
+        write_results(results, sys.stdout)
+
+    if baseline:
+        write_comparison(read_results(Path(baseline)), results, sys.stderr)
+
+
+if __name__ == '__main__':
+    main()  # pylint: disable=no-value-for-parameter
@@ -36,6 +36,17 @@ def main(
 @click.option(
     '--clang-format/--no-clang-format', default=True,
     help="Apply clang-format.")
+@click.option(
+    '--layout', type=click.Choice(['schema', 'namespace', 'table']),
+    default='schema',
+    help="One source per schema, or sources split per namespace or "
+    "per table with implementation declarations in private headers.")
+@click.option(
+    '--unity-size', default=0, type=int,
+    help="Merge every N split sources into one (unity build).")
+@click.option(
+    '--list-outputs', is_flag=True, default=False,
+    help="Print files that would be generated and exit.")
 @click.argument('library_name', type=str)
 @click.argument(
     'schema_file', nargs=-1,
@@ -51,13 +62,46 @@ def cpp(
 ):
     from flatboobs.codegen.generate_cpp import generate_cpp
 
-    generate_cpp(
+    output_files = generate_cpp(
         list(map(Path, schema_file)),
         list(map(Path, include_path)),
         Path(output_dir),
         library_name,
         options=kwargs
     )
+    if kwargs.get('list_outputs', False):
+        click.echo('\n'.join(str(x.resolve()) for x in output_files))
+
+
+@main.command(help="Generates Python asyncio RPC stubs for services.")
+@click.option(
+    '--output-dir', '-o', default='./',
+    type=click.Path(
+        file_okay=False, dir_okay=True, writable=True,
+        resolve_path=True))
+@click.option(
+    '--include-path', '-I', multiple=True,
+    type=click.Path(
+        file_okay=False, dir_okay=True, readable=True,
+        resolve_path=True))
+@click.argument(
+    'schema_file', nargs=-1,
+    type=click.Path(
+        file_okay=True, dir_okay=False, readable=True, resolve_path=True))
+def rpc(
+        output_dir: str = './',
+        include_path: Sequence[str] = tuple(),
+        schema_file: Sequence[str] = tuple(),
+        **kwargs
+):
+    from flatboobs.codegen.generate_rpc import generate_rpc
+
+    generate_rpc(
+        list(map(Path, schema_file)),
+        list(map(Path, include_path)),
+        Path(output_dir),
+        options=kwargs
+    )
 
 
 @main.command(name="list",
@@ -1,8 +1,10 @@
 # pylint: disable=missing-docstring
 
+import itertools
 from pathlib import Path
-from typing import Any, Mapping, Sequence
+from typing import Any, Dict, List, Mapping, Sequence, Tuple, Union
 
+import toolz.itertoolz as it
 from jinja2 import Environment, PackageLoader
 
 from flatboobs import idl  # type: ignore
@@ -14,6 +16,8 @@ from .tests import TESTS
 
 logger = logging.getLogger()
 
+Definition = Union[idl.StructDef, idl.EnumDef]
+
 
 def make_code(
         env: Environment,
@@ -37,13 +41,114 @@ def make_code(
     output_file.write_text(txt, encoding='utf-8')
 
 
+UNSUPPORTED_TYPES = (idl.BaseType.STRING, idl.BaseType.UNION)
+
+
+def check_supported(parser: idl.Parser) -> None:
+    """
+    Rejects tables with string or union fields, generated code has no
+    representation for them and would drop them silently.
+    """
+    for entry in parser.types:
+        definition = entry.definition
+        if not TESTS['instance_of'](definition, 'StructDef') \
+                or not TESTS['defined_here'](definition, parser):
+            continue
+        for field in definition.fields:
+            if 'deprecated' in field.attributes:
+                continue
+            type_ = field.value.type
+            if type_.base_type in UNSUPPORTED_TYPES or (
+                    type_.base_type == idl.BaseType.VECTOR
+                    and type_.element in UNSUPPORTED_TYPES):
+                raise ValueError(
+                    f"Field {definition.fully_qualified_name}.{field.name} "
+                    "of string or union type is not supported")
+
+
+def split_definitions(
+        parser: idl.Parser,
+        layout: str,
+        unity_size: int = 0,
+) -> List[Tuple[str, List[Definition]]]:
+    """
+    Groups definitions of schema into source units by namespace or
+    by definition, ``unity_size`` consecutive units are merged into one.
+    """
+    definitions = [
+        entry.definition for entry in parser.types
+        if TESTS['defined_here'](entry.definition, parser)
+    ]
+    definitions.sort(
+        key=lambda x: (x.defined_namespace.components, x.name))
+
+    units: List[Tuple[str, List[Definition]]] = []
+    if layout == 'table':
+        # Names are qualified only when the same name is in many namespaces
+        counts = it.frequencies(x.name for x in definitions)
+        units = [
+            (x.name if counts[x.name] == 1 else
+             '_'.join([*x.defined_namespace.components, x.name]), [x])
+            for x in definitions
+        ]
+    elif layout == 'namespace':
+        for components, group in itertools.groupby(
+                definitions, lambda x: x.defined_namespace.components):
+            units.append(('_'.join(components) or 'global', list(group)))
+    else:
+        raise ValueError(f"Unknown layout {layout}")
+
+    if unity_size > 0:
+        units = [
+            (f'unity_{i}', list(it.concat(x[1] for x in chunk)))
+            for i, chunk in enumerate(it.partition_all(unity_size, units))
+        ]
+    return units
+
+
+def plan_cpp(
+        schema_file: Path,
+        parser: idl.Parser,
+        output_dir: Path,
+        library_name: str,
+        options: Mapping[str, Any],
+) -> List[Tuple[str, Path, Dict[str, Any]]]:
+    """
+    Returns list of (template, output file, extra options)
+    to generate for schema.
+    """
+    include_dir = output_dir / 'include' / library_name
+    source_dir = output_dir / 'src' / library_name
+    stem = schema_file.stem
+
+    plan: List[Tuple[str, Path, Dict[str, Any]]] = [
+        ("cpp/main.hpp.txt", include_dir / f"{stem}.hpp", {})]
+    if options.get("header_only", False):
+        return plan
+
+    plan.append(("cpp/main.cpp.txt", source_dir / f"{stem}.cpp", {}))
+    if not options['split']:
+        return plan
+
+    plan.append(("cpp/impl.hpp.txt", source_dir / f"{stem}_impl.hpp", {}))
+    for name, definitions in split_definitions(
+            parser, options['layout'], options.get('unity_size', 0)):
+        plan.append(("cpp/unit.cpp.txt", source_dir / stem / f"{name}.cpp",
+                     {'definitions': definitions}))
+    return plan
+
+
 def generate_cpp(
         schema_files: Sequence[Path],
         include_paths: Sequence[Path],
         output_dir: Path,
         library_name: str,
         options: Mapping[str, Any],
-) -> None:
+) -> List[Path]:
+    """
+    Generates C++ code of schema files, returns list of output files.
+    Nothing is written when ``list_outputs`` option is set.
+    """
 
     env = Environment(
         loader=PackageLoader('flatboobs', 'templates'),
@@ -59,20 +164,34 @@ def generate_cpp(
 
     options = dict(options)
     options['library_name'] = library_name
+    options.setdefault('layout', 'schema')
+    if options.get('header_only', False) and options['layout'] != 'schema':
+        logger.warning("Layout %s is ignored for header only library",
+                       options['layout'])
+        options['layout'] = 'schema'
+    if options.get('unity_size', 0) > 0 and options['layout'] == 'schema':
+        logger.warning("Unity size is ignored for schema layout")
+        options['unity_size'] = 0
+    options['split'] = options['layout'] != 'schema'
+
+    output_files: List[Path] = []
+    if options['split']:
+        template = "cpp/pch.hpp.txt"
+        output_file = output_dir / 'src' / library_name / "pch.hpp"
+        output_files.append(output_file)
+        if not options.get('list_outputs', False):
+            make_code(env, template, output_file, options)
 
     for schema_file, parser in load_schema(schema_files, include_paths):
 
+        check_supported(parser)
         options['parser'] = parser
         options['schema_file'] = schema_file
 
-        template = "cpp/main.hpp.txt"
-        output_file = (output_dir / 'include' / library_name
-                       / f"{schema_file.stem}.hpp")
-        make_code(env, template, output_file, options)
+        for template, output_file, extra in plan_cpp(
+                schema_file, parser, output_dir, library_name, options):
+            output_files.append(output_file)
+            if not options.get('list_outputs', False):
+                make_code(env, template, output_file, {**options, **extra})
 
-        if not options.get("header_only", False):
-
-            template = "cpp/main.cpp.txt"
-            output_file = (output_dir / 'src' / library_name
-                           / f"{schema_file.stem}.cpp")
-            make_code(env, template, output_file, options)
+    return output_files
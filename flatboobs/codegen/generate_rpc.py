@@ -0,0 +1,49 @@
+# pylint: disable=missing-docstring
+
+from pathlib import Path
+from typing import Any, Mapping, Sequence
+
+from jinja2 import Environment, PackageLoader
+
+from flatboobs import load_schema, logging
+
+from .filters import FILTERS
+from .generate_cpp import make_code
+from .tests import TESTS
+
+logger = logging.getLogger()
+
+
+def generate_rpc(
+        schema_files: Sequence[Path],
+        include_paths: Sequence[Path],
+        output_dir: Path,
+        options: Mapping[str, Any],
+) -> None:
+
+    env = Environment(
+        loader=PackageLoader('flatboobs', 'templates'),
+        autoescape=False,
+        trim_blocks=True,
+        lstrip_blocks=True,
+    )
+    env.filters.update(FILTERS)
+    env.tests.update(TESTS)
+
+    options = dict(options)
+    options['clang_format'] = False
+
+    for schema_file, parser in load_schema(schema_files, include_paths):
+
+        services = [service_def for service_def in parser.services
+                    if TESTS['defined_here'](service_def, parser)]
+        if not services:
+            logger.info("No services in %s", schema_file)
+            continue
+
+        options['parser'] = parser
+        options['schema_file'] = schema_file
+
+        template = "python/rpc.py.txt"
+        output_file = output_dir / f"{schema_file.stem}_rpc.py"
+        make_code(env, template, output_file, options)
@@ -0,0 +1,440 @@
+# pylint: disable=missing-docstring
+"""
+asyncio RPC transport for schema ``rpc_service`` definitions.
+
+Every frame is size prefixed and carries one flatboobs message:
+
+    size:uint32 | call_id:uint32 | method_id:uint32 | kind:uint32 | payload
+
+``size`` counts bytes after itself, all header fields are little endian.
+Responses reuse ``call_id`` of the request, so any number of calls can be
+in flight on one connection and answered in any order.
+"""
+
+import asyncio
+import itertools
+import struct
+from typing import (Any, Awaitable, Callable, Dict, List, Mapping, Optional,
+                    Set, Tuple, Union)
+
+from flatboobs import logging
+
+try:
+    from flatboobs.flatboobs import Bytes  # type: ignore
+except ImportError:  # extension module is not built
+    Bytes = None
+
+logger = logging.getLogger()
+
+HEADER = struct.Struct('<IIII')
+HEADER_SIZE = HEADER.size
+SIZE_PREFIX = 4
+MAX_FRAME_SIZE = 0x7fffffff
+MAX_CONCURRENCY = 64
+INTERNAL_ERROR = "Internal server error"
+
+KIND_REQUEST = 0
+KIND_RESPONSE = 1
+KIND_ERROR = 2
+
+Payload = Union[bytes, memoryview, Any]
+Handler = Callable[[Payload], Awaitable[Payload]]
+
+
+class RPCError(Exception):
+    """
+    Error reported to client. Handlers raise it to send message back,
+    any other exception is reported as internal error.
+    """
+
+
+def method_id(name: str) -> int:
+    """
+    32 bit FNV-1a hash of fully qualified method name
+    like "namespace.Service.Method".
+    """
+    value = 0x811c9dc5
+    for byte in name.encode('utf-8'):
+        value = ((value ^ byte) * 0x01000193) & 0xffffffff
+    return value
+
+
+def encode_header(
+        payload_size: int, call_id: int, method: int, kind: int,
+) -> bytes:
+    return HEADER.pack(
+        HEADER_SIZE - SIZE_PREFIX + payload_size, call_id, method, kind)
+
+
+def _payload(chunk: bytes, start: int, end: int) -> Payload:
+    """
+    Hands off payload without copying. Data stays owned by received chunk.
+    """
+    if Bytes is not None:
+        return Bytes(chunk, end - start, start)
+    return memoryview(chunk)[start:end]
+
+
+class FrameProtocol(asyncio.Protocol):
+    """
+    Splits incoming stream into frames.
+    Frames contained in one received chunk are not copied.
+    """
+
+    def __init__(self) -> None:
+        self.transport: Optional[asyncio.Transport] = None
+        self._pending: List[bytes] = []
+        self._pending_size = 0
+        self._frame_size = 0
+        self._closed: asyncio.Future = (
+            asyncio.get_event_loop().create_future())
+        self._writable = asyncio.Event()
+        self._writable.set()
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self.transport = transport  # type: ignore
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        if not self._closed.done():
+            self._closed.set_result(exc)
+        self._writable.set()
+
+    async def wait_closed(self) -> None:
+        await asyncio.shield(self._closed)
+
+    def pause_writing(self) -> None:
+        self._writable.clear()
+
+    def resume_writing(self) -> None:
+        self._writable.set()
+
+    async def drain(self) -> None:
+        """
+        Waits until transport write buffer is below high-water mark.
+        """
+        await self._writable.wait()
+
+    def _malformed(self) -> None:
+        logger.error("Malformed RPC frame, closing connection")
+        self._pending = []
+        self._pending_size = 0
+        self.transport.close()  # type: ignore
+
+    def data_received(self, data: bytes) -> None:
+        if self._pending:
+            self._pending.append(data)
+            self._pending_size += len(data)
+            if self._pending_size < self._frame_size:
+                return
+            data = b''.join(self._pending)
+            self._pending = []
+            self._pending_size = 0
+        self._parse(data)
+
+    def accepting_frames(self) -> bool:
+        """
+        Frames are left in buffer while it returns False,
+        call ``resume_frames`` to parse them later.
+        """
+        return True
+
+    def resume_frames(self) -> None:
+        if not self._pending or self._pending_size < self._frame_size:
+            return
+        data = b''.join(self._pending)
+        self._pending = []
+        self._pending_size = 0
+        self._parse(data)
+
+    def _parse(self, data: bytes) -> None:
+        offset = 0
+        size = len(data)
+        while size - offset >= HEADER_SIZE:
+            frame_size = SIZE_PREFIX + int.from_bytes(
+                data[offset:offset + SIZE_PREFIX], 'little')
+            if frame_size < HEADER_SIZE or frame_size > MAX_FRAME_SIZE:
+                self._malformed()
+                return
+            if size - offset < frame_size or not self.accepting_frames():
+                break
+            _, call_id, method, kind = HEADER.unpack_from(data, offset)
+            self.frame_received(
+                call_id, method, kind,
+                _payload(data, offset + HEADER_SIZE, offset + frame_size))
+            offset += frame_size
+
+        if offset < size:
+            tail = data[offset:]
+            self._pending = [tail]
+            self._pending_size = len(tail)
+            self._frame_size = (
+                SIZE_PREFIX + int.from_bytes(tail[:SIZE_PREFIX], 'little')
+                if len(tail) >= SIZE_PREFIX else HEADER_SIZE)
+            # Do not buffer frame that would be rejected anyway
+            if (self._frame_size < HEADER_SIZE
+                    or self._frame_size > MAX_FRAME_SIZE):
+                self._malformed()
+
+    def frame_received(
+            self, call_id: int, method: int, kind: int, payload: Payload,
+    ) -> None:
+        raise NotImplementedError
+
+    def send_frame(
+            self, call_id: int, method: int, kind: int, payload: Payload,
+    ) -> None:
+        view = memoryview(payload)
+        self.transport.writelines((  # type: ignore
+            encode_header(view.nbytes, call_id, method, kind), view))
+
+
+class ChannelProtocol(FrameProtocol):
+    """
+    Client side of one connection. Requests are pipelined.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._call_ids = itertools.count(1)
+        self._calls: Dict[int, asyncio.Future] = dict()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    @property
+    def is_closed(self) -> bool:
+        return self._closed.done()
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        super().connection_lost(exc)
+        calls, self._calls = self._calls, dict()
+        for future in calls.values():
+            if not future.done():
+                future.set_exception(
+                    ConnectionError("RPC connection lost"))
+
+    def frame_received(
+            self, call_id: int, method: int, kind: int, payload: Payload,
+    ) -> None:
+        future = self._calls.pop(call_id, None)
+        if future is None or future.done():
+            return
+        if kind == KIND_RESPONSE:
+            future.set_result(payload)
+        else:
+            future.set_exception(
+                RPCError(bytes(memoryview(payload)).decode('utf-8')))
+
+    def call(self, method: int, payload: Payload) -> Awaitable[Payload]:
+        if self.is_closed:
+            raise ConnectionError("RPC connection closed")
+        call_id = next(self._call_ids) & 0xffffffff
+        future = asyncio.get_event_loop().create_future()
+        self._calls[call_id] = future
+        self.send_frame(call_id, method, KIND_REQUEST, payload)
+        return future
+
+
+class ServerProtocol(FrameProtocol):
+    """
+    Server side of one connection. Each request runs in its own task,
+    responses are sent as soon as they are ready.
+
+    Handlers of all connections share ``semaphore``. Reading from
+    connection is paused while it has ``max_concurrency`` requests
+    in flight, so slow peer could not grow buffers without bound.
+    Frames received beyond the limit wait in buffer for free slot.
+    """
+
+    def __init__(
+            self,
+            handlers: Mapping[int, Handler],
+            semaphore: asyncio.Semaphore,
+            max_concurrency: int = MAX_CONCURRENCY,
+    ) -> None:
+        super().__init__()
+        self._handlers = handlers
+        self._semaphore = semaphore
+        self._max_concurrency = max_concurrency
+        self._tasks: Set[asyncio.Future] = set()
+        self._reading = True
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        super().connection_lost(exc)
+        tasks, self._tasks = self._tasks, set()
+        for task in tasks:
+            task.cancel()
+
+    def frame_received(
+            self, call_id: int, method: int, kind: int, payload: Payload,
+    ) -> None:
+        if kind != KIND_REQUEST:
+            return
+        task = asyncio.ensure_future(self._dispatch(call_id, method, payload))
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        if self._reading and len(self._tasks) >= self._max_concurrency:
+            self._reading = False
+            self.transport.pause_reading()  # type: ignore
+
+    def accepting_frames(self) -> bool:
+        return len(self._tasks) < self._max_concurrency
+
+    def _task_done(self, task: asyncio.Future) -> None:
+        self._tasks.discard(task)
+        if self.transport is None or self.transport.is_closing():
+            return
+        # Buffered frames go first, they could fill free slots again
+        self.resume_frames()
+        if not self._reading and self.accepting_frames():
+            self._reading = True
+            self.transport.resume_reading()
+
+    async def _dispatch(
+            self, call_id: int, method: int, payload: Payload,
+    ) -> None:
+        handler = self._handlers.get(method)
+        try:
+            if handler is None:
+                raise RPCError(f"Unknown method {method:#010x}")
+            async with self._semaphore:
+                response = await handler(payload)
+        except RPCError as exc:
+            logger.debug("RPC call %d failed: %r", call_id, exc)
+            kind, response = KIND_ERROR, str(exc).encode('utf-8')
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("RPC call %d failed", call_id)
+            kind, response = KIND_ERROR, INTERNAL_ERROR.encode('utf-8')
+        else:
+            kind = KIND_RESPONSE
+        await self.drain()
+        if self.transport is None or self.transport.is_closing():
+            return
+        self.send_frame(call_id, method, kind, response)
+
+
+Address = Union[str, Tuple[str, int]]
+
+
+class Client:
+    """
+    Pool of pipelined connections to one server.
+    ``address`` is path of Unix socket or ``(host, port)`` tuple.
+    """
+
+    def __init__(self, address: Address, pool_size: int = 4) -> None:
+        if pool_size < 1:
+            raise ValueError("pool_size must be positive")
+        self.address = address
+        self.pool_size = pool_size
+        self._channels: List[ChannelProtocol] = []
+        self._connecting: Optional[asyncio.Future] = None
+
+    async def __aenter__(self) -> 'Client':
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def _connect(self) -> ChannelProtocol:
+        loop = asyncio.get_event_loop()
+        if isinstance(self.address, str):
+            _, protocol = await loop.create_unix_connection(
+                ChannelProtocol, self.address)
+        else:
+            host, port = self.address
+            _, protocol = await loop.create_connection(
+                ChannelProtocol, host, port)
+        return protocol  # type: ignore
+
+    async def _channel(self) -> ChannelProtocol:
+        self._channels = [x for x in self._channels if not x.is_closed]
+        idle = min(self._channels, key=lambda x: x.in_flight, default=None)
+        if idle is not None and (
+                idle.in_flight == 0 or len(self._channels) >= self.pool_size):
+            return idle
+        if self._connecting is None:
+            self._connecting = asyncio.ensure_future(self._connect())
+        connecting = self._connecting
+        try:
+            channel = await asyncio.shield(connecting)
+        finally:
+            if self._connecting is connecting:
+                self._connecting = None
+        if channel not in self._channels:
+            self._channels.append(channel)
+        return channel
+
+    async def call(self, method: int, payload: Payload) -> Payload:
+        channel = await self._channel()
+        await channel.drain()
+        return await channel.call(method, payload)
+
+    async def close(self) -> None:
+        channels, self._channels = self._channels, []
+        for channel in channels:
+            if channel.transport is not None:
+                channel.transport.close()
+        for channel in channels:
+            await channel.wait_closed()
+
+
+class Server:
+    """
+    Serves handlers produced by generated ``*Servicer`` classes.
+    """
+
+    def __init__(
+            self, *servicers: Any, max_concurrency: int = MAX_CONCURRENCY,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be positive")
+        self.handlers: Dict[int, Handler] = dict()
+        for servicer in servicers:
+            self.handlers.update(servicer.rpc_handlers())
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._servers: List[asyncio.AbstractServer] = []
+
+    def _protocol(self) -> ServerProtocol:
+        assert self._semaphore is not None
+        return ServerProtocol(
+            self.handlers, self._semaphore, self.max_concurrency)
+
+    async def start(self, address: Address) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        loop = asyncio.get_event_loop()
+        if isinstance(address, str):
+            server = await loop.create_unix_server(self._protocol, address)
+        else:
+            host, port = address
+            server = await loop.create_server(self._protocol, host, port)
+        self._servers.append(server)
+
+    @property
+    def sockets(self) -> List[Any]:
+        return [sock for server in self._servers
+                for sock in (server.sockets or [])]
+
+    async def __aenter__(self) -> 'Server':
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.close()
+        await self.wait_closed()
+
+    def close(self) -> None:
+        for server in self._servers:
+            server.close()
+
+    async def wait_closed(self) -> None:
+        for server in self._servers:
+            await server.wait_closed()
+        self._servers = []
+
+
+__all__ = [
+    'Client', 'Payload', 'RPCError', 'Server', 'method_id',
+]
@@ -0,0 +1,496 @@
+#ifndef FLATBOOBS_ARCHIVE_HPP_
+#define FLATBOOBS_ARCHIVE_HPP_
+
+/*
+ * Block compressed message archive with random access.
+ * Requires zlib and threads, link with ZLIB::ZLIB and Threads::Threads.
+ *
+ * Layout, all integers are little endian:
+ *
+ *   block 0 .. block N-1    zlib compressed blocks
+ *   index                   blocks, messages and sorted keys
+ *   footer                  index offset, index size, magic
+ *
+ * Block holds consecutive messages aligned to largest scalar,
+ * so messages could be accessed in place of decompressed block.
+ */
+
+#include <flatboobs/exceptions.hpp>
+#include <flatboobs/message.hpp>
+#include <flatbuffers/flatbuffers.h>
+
+#include <algorithm>
+#include <deque>
+#include <future>
+#include <list>
+#include <mutex>
+#include <optional>
+#include <ostream>
+#include <stdexcept>
+#include <string>
+#include <string_view>
+#include <thread>
+#include <unordered_map>
+#include <utility>
+#include <vector>
+#include <zlib.h>
+
+namespace flatboobs {
+
+namespace detail {
+namespace archive {
+
+constexpr std::string_view magic = "FBOOBSA1";
+constexpr size_t footer_size = 2 * sizeof(uint64_t) + magic.size();
+constexpr size_t alignment = sizeof(flatbuffers::largest_scalar_t);
+// Upper bound of zlib compression ratio
+constexpr uint64_t max_expansion = 1032;
+
+using buffer_type = std::vector<std::byte>;
+
+struct BlockInfo {
+  uint64_t offset;
+  uint64_t compressed_size;
+  uint64_t raw_size;
+};
+
+struct MessageInfo {
+  uint64_t block;
+  uint64_t offset;
+  uint64_t size;
+};
+
+inline size_t default_threads(size_t _threads) {
+  if (_threads)
+    return _threads;
+  return std::max<size_t>(1, std::thread::hardware_concurrency());
+}
+
+inline buffer_type compress(const buffer_type &_raw, int _level) {
+  uLongf size = compressBound(_raw.size());
+  buffer_type compressed(size);
+  int status =
+      compress2(reinterpret_cast<Bytef *>(compressed.data()), &size,
+                reinterpret_cast<const Bytef *>(_raw.data()), _raw.size(),
+                _level);
+  if (status != Z_OK)
+    throw archive_error("Block compression failed");
+  compressed.resize(size);
+  return compressed;
+}
+
+inline buffer_type decompress(const std::byte *_data, size_t _size,
+                              size_t _raw_size) {
+  buffer_type raw(_raw_size);
+  uLongf size = _raw_size;
+  int status = uncompress(reinterpret_cast<Bytef *>(raw.data()), &size,
+                          reinterpret_cast<const Bytef *>(_data), _size);
+  if (status != Z_OK || size != _raw_size)
+    throw archive_error("Block decompression failed");
+  return raw;
+}
+
+template <typename T> void write(std::string &_buffer, T _value) {
+  char data[sizeof(T)];
+  flatbuffers::WriteScalar(data, _value);
+  _buffer.append(data, sizeof(T));
+}
+
+// Bounds checked reading of index
+class Cursor {
+public:
+  Cursor(std::string_view _data) noexcept : data_{_data} {}
+
+  template <typename T> T read() {
+    return flatbuffers::ReadScalar<T>(take(sizeof(T)).data());
+  }
+  // Count of records that have to fit into rest of index
+  size_t count(size_t _record_size) {
+    uint64_t count = read<uint64_t>();
+    if (count > data_.size() / _record_size)
+      throw archive_error("Malformed archive index");
+    return count;
+  }
+  std::string_view take(size_t _size) {
+    if (_size > data_.size())
+      throw archive_error("Malformed archive index");
+    std::string_view result = data_.substr(0, _size);
+    data_.remove_prefix(_size);
+    return result;
+  }
+
+private:
+  std::string_view data_;
+};
+
+} // namespace archive
+} // namespace detail
+
+/*
+ * ArchiveWriter
+ * Groups appended messages into blocks of about block_size bytes,
+ * full blocks are compressed in parallel by up to threads workers.
+ * Index is written by close(), archive is not readable before.
+ */
+
+class ArchiveWriter {
+public:
+  explicit ArchiveWriter(std::ostream &_stream, size_t _block_size = 1 << 20,
+                         int _level = Z_DEFAULT_COMPRESSION,
+                         size_t _threads = 0)
+      : stream_{_stream}, block_size_{_block_size}, level_{_level},
+        threads_{detail::archive::default_threads(_threads)}, offset_{0},
+        closed_{false} {}
+
+  ArchiveWriter(const ArchiveWriter &) = delete;
+  ArchiveWriter &operator=(const ArchiveWriter &) = delete;
+
+  ~ArchiveWriter() {
+    try {
+      close();
+    } catch (...) {
+    }
+  }
+
+  // Returns ordinal of message
+  size_t append(const Message &_message) {
+    if (closed_)
+      throw archive_error("Archive is closed");
+
+    raw_.resize(flatbuffers::PaddingBytes(raw_.size(),
+                                          detail::archive::alignment) +
+                raw_.size());
+    messages_.push_back({blocks_.size(), raw_.size(), _message.size()});
+    raw_.insert(raw_.end(), _message.data(),
+                _message.data() + _message.size());
+
+    if (raw_.size() >= block_size_)
+      flush_block();
+    return messages_.size() - 1;
+  }
+  size_t append(const Message &_message, std::string_view _key) {
+    size_t ordinal = append(_message);
+    keys_.emplace_back(_key, ordinal);
+    return ordinal;
+  }
+
+  size_t size() const noexcept { return messages_.size(); }
+
+  void close() {
+    if (closed_)
+      return;
+    closed_ = true;
+
+    if (!raw_.empty())
+      flush_block();
+    write_blocks(0);
+
+    std::stable_sort(
+        keys_.begin(), keys_.end(),
+        [](const auto &_lhs, const auto &_rhs) {
+          return _lhs.first < _rhs.first;
+        });
+
+    using detail::archive::write;
+    std::string index{};
+    write<uint64_t>(index, blocks_.size());
+    for (const auto &block : blocks_) {
+      write<uint64_t>(index, block.offset);
+      write<uint64_t>(index, block.compressed_size);
+      write<uint64_t>(index, block.raw_size);
+    }
+    write<uint64_t>(index, messages_.size());
+    for (const auto &message : messages_) {
+      write<uint64_t>(index, message.block);
+      write<uint64_t>(index, message.offset);
+      write<uint64_t>(index, message.size);
+    }
+    write<uint64_t>(index, keys_.size());
+    for (const auto &[key, ordinal] : keys_) {
+      write<uint64_t>(index, ordinal);
+      write<uint64_t>(index, key.size());
+      index.append(key);
+    }
+
+    std::string footer{};
+    write<uint64_t>(footer, offset_);
+    write<uint64_t>(footer, index.size());
+    footer.append(detail::archive::magic);
+
+    stream_.write(index.data(), index.size());
+    stream_.write(footer.data(), footer.size());
+    stream_.flush();
+    if (!stream_)
+      throw archive_error("Archive write failed");
+  }
+
+private:
+  void flush_block() {
+    blocks_.push_back({0, 0, raw_.size()});
+    pending_.push_back(std::async(
+        std::launch::async,
+        [raw = std::move(raw_), level = level_]() {
+          return detail::archive::compress(raw, level);
+        }));
+    raw_ = detail::archive::buffer_type{};
+    raw_.reserve(block_size_);
+    write_blocks(threads_);
+  }
+
+  // Writes compressed blocks in order until at most _keep are pending
+  void write_blocks(size_t _keep) {
+    while (pending_.size() > _keep) {
+      detail::archive::buffer_type compressed = pending_.front().get();
+      pending_.pop_front();
+
+      auto &block = blocks_[blocks_.size() - pending_.size() - 1];
+      block.offset = offset_;
+      block.compressed_size = compressed.size();
+      stream_.write(reinterpret_cast<const char *>(compressed.data()),
+                    compressed.size());
+      offset_ += compressed.size();
+    }
+    if (!stream_)
+      throw archive_error("Archive write failed");
+  }
+
+  std::ostream &stream_;
+  const size_t block_size_;
+  const int level_;
+  const size_t threads_;
+  uint64_t offset_;
+  bool closed_;
+
+  detail::archive::buffer_type raw_;
+  std::deque<std::future<detail::archive::buffer_type>> pending_;
+  std::vector<detail::archive::BlockInfo> blocks_;
+  std::vector<detail::archive::MessageInfo> messages_;
+  std::vector<std::pair<std::string, size_t>> keys_;
+};
+
+/*
+ * ArchiveReader
+ * Random access to messages of archive, e.g. memory mapped file.
+ *
+ * Only blocks of requested messages are decompressed, recently used
+ * blocks are kept in LRU cache of cache_blocks entries. Returned
+ * messages are views of decompressed block and keep it alive after
+ * eviction from cache. Reader is safe to use from many threads.
+ */
+
+class ArchiveReader {
+public:
+  explicit ArchiveReader(Message _archive, size_t _cache_blocks = 16,
+                         size_t _threads = 0)
+      : archive_{std::move(_archive)}, cache_blocks_{_cache_blocks},
+        threads_{detail::archive::default_threads(_threads)},
+        decompressions_{0} {
+    read_index();
+  }
+
+  ArchiveReader(const ArchiveReader &) = delete;
+  ArchiveReader &operator=(const ArchiveReader &) = delete;
+
+  size_t size() const noexcept { return messages_.size(); }
+  bool empty() const noexcept { return messages_.empty(); }
+  size_t block_count() const noexcept { return blocks_.size(); }
+
+  // Number of blocks decompressed so far
+  size_t decompressions() const {
+    std::lock_guard<std::mutex> lock{mutex_};
+    return decompressions_;
+  }
+
+  Message operator[](size_t _ordinal) const {
+    const auto &info = messages_[_ordinal];
+    return Message{MessageSlice{block(info.block), info.offset, info.size}};
+  }
+  Message at(size_t _ordinal) const {
+    if (_ordinal >= size())
+      throw std::out_of_range("Archive ordinal out of range");
+    return (*this)[_ordinal];
+  }
+
+  // Ordinal of first message with key
+  std::optional<size_t> find(std::string_view _key) const {
+    auto it = std::lower_bound(
+        keys_.begin(), keys_.end(), _key,
+        [](const auto &_item, std::string_view _value) {
+          return _item.first < _value;
+        });
+    if (it == keys_.end() || it->first != _key)
+      return std::nullopt;
+    return it->second;
+  }
+  Message at(std::string_view _key) const {
+    std::optional<size_t> ordinal = find(_key);
+    if (!ordinal)
+      throw key_error("Archive key not found");
+    return (*this)[*ordinal];
+  }
+
+  // Reads many messages, missing blocks are decompressed in parallel
+  std::vector<Message> read(const std::vector<size_t> &_ordinals) const {
+    std::vector<size_t> indices{};
+    indices.reserve(_ordinals.size());
+    for (size_t ordinal : _ordinals) {
+      if (ordinal >= size())
+        throw std::out_of_range("Archive ordinal out of range");
+      indices.push_back(messages_[ordinal].block);
+    }
+    std::sort(indices.begin(), indices.end());
+    indices.erase(std::unique(indices.begin(), indices.end()), indices.end());
+
+    std::unordered_map<size_t, Message> blocks{};
+    std::vector<size_t> missing{};
+    {
+      std::lock_guard<std::mutex> lock{mutex_};
+      for (size_t index : indices) {
+        std::optional<Message> cached = lookup(index);
+        if (cached)
+          blocks.emplace(index, std::move(*cached));
+        else
+          missing.push_back(index);
+      }
+    }
+
+    for (size_t first = 0; first < missing.size(); first += threads_) {
+      size_t last = std::min(missing.size(), first + threads_);
+      std::vector<std::future<Message>> futures{};
+      for (size_t i = first; i < last; i++)
+        futures.push_back(std::async(std::launch::async,
+                                     [this, index = missing[i]]() {
+                                       return decompress(index);
+                                     }));
+      for (size_t i = first; i < last; i++)
+        blocks.emplace(missing[i],
+                       insert(missing[i], futures[i - first].get()));
+    }
+
+    std::vector<Message> result{};
+    result.reserve(_ordinals.size());
+    for (size_t ordinal : _ordinals) {
+      const auto &info = messages_[ordinal];
+      result.push_back(Message{
+          MessageSlice{blocks.at(info.block), info.offset, info.size}});
+    }
+    return result;
+  }
+
+private:
+  using cache_type = std::list<std::pair<size_t, Message>>;
+
+  void read_index() {
+    using detail::archive::footer_size;
+    using detail::archive::magic;
+    using detail::archive::max_expansion;
+
+    std::string_view data = archive_.str();
+    if (data.size() < footer_size ||
+        data.substr(data.size() - magic.size()) != magic)
+      throw archive_error("Not a flatboobs archive");
+
+    detail::archive::Cursor footer{data.substr(data.size() - footer_size)};
+    uint64_t index_offset = footer.read<uint64_t>();
+    uint64_t index_size = footer.read<uint64_t>();
+    if (index_offset > data.size() - footer_size ||
+        index_size != data.size() - footer_size - index_offset)
+      throw archive_error("Malformed archive footer");
+
+    detail::archive::Cursor index{data.substr(index_offset, index_size)};
+
+    blocks_.resize(index.count(3 * sizeof(uint64_t)));
+    for (auto &block : blocks_) {
+      block.offset = index.read<uint64_t>();
+      block.compressed_size = index.read<uint64_t>();
+      block.raw_size = index.read<uint64_t>();
+      if (block.offset > index_offset ||
+          block.compressed_size > index_offset - block.offset)
+        throw archive_error("Archive block out of range");
+      if (block.raw_size > block.compressed_size * max_expansion)
+        throw archive_error("Archive block size out of range");
+    }
+
+    messages_.resize(index.count(3 * sizeof(uint64_t)));
+    for (auto &message : messages_) {
+      message.block = index.read<uint64_t>();
+      message.offset = index.read<uint64_t>();
+      message.size = index.read<uint64_t>();
+      if (message.block >= blocks_.size() ||
+          message.offset > blocks_[message.block].raw_size ||
+          message.size > blocks_[message.block].raw_size - message.offset)
+        throw archive_error("Archive message out of range");
+    }
+
+    // Key record is ordinal and length at least
+    keys_.resize(index.count(2 * sizeof(uint64_t)));
+    for (auto &[key, ordinal] : keys_) {
+      ordinal = index.read<uint64_t>();
+      key = index.take(index.read<uint64_t>());
+      if (ordinal >= messages_.size())
+        throw archive_error("Archive key out of range");
+    }
+  }
+
+  Message block(size_t _index) const {
+    {
+      std::lock_guard<std::mutex> lock{mutex_};
+      std::optional<Message> cached = lookup(_index);
+      if (cached)
+        return std::move(*cached);
+    }
+    return insert(_index, decompress(_index));
+  }
+
+  Message decompress(size_t _index) const {
+    const auto &info = blocks_[_index];
+    return Message{detail::archive::decompress(archive_.data() + info.offset,
+                                               info.compressed_size,
+                                               info.raw_size)};
+  }
+
+  // Moves cached block to front, requires lock
+  std::optional<Message> lookup(size_t _index) const {
+    auto it = cache_map_.find(_index);
+    if (it == cache_map_.end())
+      return std::nullopt;
+    cache_.splice(cache_.begin(), cache_, it->second);
+    return it->second->second;
+  }
+
+  // Block decompressed concurrently by other thread wins
+  Message insert(size_t _index, Message _block) const {
+    std::lock_guard<std::mutex> lock{mutex_};
+    decompressions_++;
+    std::optional<Message> cached = lookup(_index);
+    if (cached)
+      return std::move(*cached);
+    if (!cache_blocks_)
+      return _block;
+
+    cache_.emplace_front(_index, _block);
+    cache_map_[_index] = cache_.begin();
+    while (cache_.size() > cache_blocks_) {
+      cache_map_.erase(cache_.back().first);
+      cache_.pop_back();
+    }
+    return _block;
+  }
+
+  const Message archive_;
+  const size_t cache_blocks_;
+  const size_t threads_;
+
+  std::vector<detail::archive::BlockInfo> blocks_;
+  std::vector<detail::archive::MessageInfo> messages_;
+  std::vector<std::pair<std::string_view, size_t>> keys_;
+
+  mutable std::mutex mutex_;
+  mutable cache_type cache_;
+  mutable std::unordered_map<size_t, cache_type::iterator> cache_map_;
+  mutable size_t decompressions_;
+};
+
+} // namespace flatboobs
+
+#endif // FLATBOOBS_ARCHIVE_HPP_
@@ -0,0 +1,142 @@
+#ifndef FLATBOOBS_BATCH_HPP_
+#define FLATBOOBS_BATCH_HPP_
+
+#include <flatboobs/builder.hpp>
+#include <flatboobs/message.hpp>
+#include <flatboobs/stats.hpp>
+#include <flatbuffers/flatbuffers.h>
+#include <iterator>
+#include <stdexcept>
+#include <string_view>
+#include <utility>
+#include <vector>
+
+namespace flatboobs {
+
+/*
+ * MessageBatch
+ * Many messages packed into one contiguous buffer (arena).
+ *
+ * Index holds (offset, size) of every message in arena. Messages share
+ * sub-objects, so message spans from its root to the end of arena and
+ * spans of following messages are nested in it. Arena is sent as is,
+ * e.g. as one writev/sendmsg payload next to index, and receiver
+ * restores batch from both.
+ */
+
+class MessageBatch {
+public:
+  using index_type = std::vector<std::pair<size_t, size_t>>;
+
+  MessageBatch() : arena_{std::string_view{}}, index_{} {}
+  MessageBatch(Message _arena, index_type _index)
+      : arena_{std::move(_arena)}, index_{std::move(_index)} {
+    for (const auto &item : index_)
+      if (item.first + item.second > arena_.size())
+        throw std::out_of_range("Message batch index out of range");
+  }
+
+  const Message &arena() const noexcept { return arena_; }
+  const index_type &index() const noexcept { return index_; }
+
+  size_t size() const noexcept { return index_.size(); }
+  bool empty() const noexcept { return index_.empty(); }
+
+  // Zero-copy view, keeps whole arena alive
+  Message operator[](size_t _pos) const {
+    const auto &item = index_[_pos];
+    return Message{MessageSlice{arena_, item.first, item.second}};
+  }
+  Message at(size_t _pos) const {
+    if (_pos >= size())
+      throw std::out_of_range("Message batch position out of range");
+    return (*this)[_pos];
+  }
+
+private:
+  Message arena_;
+  index_type index_;
+};
+
+namespace detail {
+
+// Writes root offset and file identifier the same way as
+// FlatBufferBuilder::Finish, but builder stays open for next messages.
+inline void finish_nested_root(flatbuffers::FlatBufferBuilder &_fbb,
+                               flatbuffers::uoffset_t _root,
+                               std::string_view _file_identifier) {
+  const size_t identifier_size =
+      _file_identifier.empty() ? 0 : flatbuffers::kFileIdentifierLength;
+  _fbb.PreAlign(sizeof(flatbuffers::uoffset_t) + identifier_size,
+                sizeof(flatbuffers::largest_scalar_t));
+  if (identifier_size)
+    _fbb.PushBytes(reinterpret_cast<const uint8_t *>(_file_identifier.data()),
+                   identifier_size);
+  _fbb.PushElement(_fbb.ReferTo(_root));
+}
+
+} // namespace detail
+
+/*
+ * Packs range of tables of one type into one arena with shared
+ * BuilderContext, equal sub-objects are serialized once for whole batch.
+ * Messages are laid out in arena in range order.
+ * Range has to be bidirectional.
+ */
+
+template <typename It> MessageBatch pack_batch(It _first, It _last) {
+
+  using T = std::decay_t<decltype(*_first)>;
+
+  const size_t count = std::distance(_first, _last);
+  if (!count)
+    return MessageBatch{};
+
+  stats::record<T>(stats::Metric::packs, count);
+  stats::ScopedTimer<T> timer{stats::Metric::pack_time_ns};
+
+  BuilderAllocator allocator{};
+  flatbuffers::FlatBufferBuilder fbb{1024, allocator.get()};
+  BuilderContext context{&fbb};
+
+  // Builder grows downward, last message is built first
+  const std::string_view file_identifier = T::file_identifier();
+  std::vector<size_t> sizes(count);
+  It iter = _last;
+  for (size_t i = count; i-- > 0;) {
+    const T &table = *--iter;
+    flatbuffers::uoffset_t root = table.build(context, false).o;
+    if (!root)
+      root = context.empty_table();
+    if (i)
+      detail::finish_nested_root(fbb, root, file_identifier);
+    else
+      fbb.Finish(flatbuffers::Offset<void>(root),
+                 file_identifier.empty() ? nullptr : file_identifier.data());
+    sizes[i] = fbb.GetSize();
+  }
+
+  BuiltMessage built_message{};
+  built_message.steal_from_builder(fbb);
+  Message arena{std::move(built_message)};
+
+  MessageBatch::index_type index{};
+  index.reserve(count);
+  for (size_t size : sizes) {
+    index.emplace_back(arena.size() - size, size);
+    stats::record<T>(stats::Metric::message_size, size);
+  }
+  stats::record<T>(stats::Metric::reallocations, allocator.reallocations());
+
+  return MessageBatch{std::move(arena), std::move(index)};
+}
+
+template <typename R> MessageBatch pack_batch(const R &_tables) {
+  using std::begin;
+  using std::end;
+  return pack_batch(begin(_tables), end(_tables));
+}
+
+} // namespace flatboobs
+
+#endif // FLATBOOBS_BATCH_HPP_
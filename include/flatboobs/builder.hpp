@@ -1,4 +1,3 @@
-
 #ifndef FLATBOOBS_BUILDER_HPP
 #define FLATBOOBS_BUILDER_HPP
 
@@ -11,16 +10,72 @@ struct BuilderContext {
 
   flatbuffers::FlatBufferBuilder *fbb_;
   offset_map_t offset_map_;
+  offset_map_t nested_offset_map_;
+  flatbuffers::uoffset_t empty_table_;
 
   BuilderContext(flatbuffers::FlatBufferBuilder *_fbb)
-      : fbb_{_fbb}, offset_map_{} {
+      : fbb_{_fbb}, offset_map_{}, nested_offset_map_{}, empty_table_{0} {
     fbb_->Reset();
   }
 
   flatbuffers::FlatBufferBuilder *builder() { return fbb_; }
   offset_map_t &offset_map() { return offset_map_; }
+  // Bytes of nested flatbuffers are aligned unlike plain vectors of the
+  // same content, so they are deduplicated separately.
+  offset_map_t &nested_offset_map() { return nested_offset_map_; }
+
+  // Table without fields, valid in place of any table with default values.
+  // Built once per buffer.
+  flatbuffers::uoffset_t empty_table() {
+    if (!empty_table_)
+      empty_table_ = fbb_->EndTable(fbb_->StartTable());
+    return empty_table_;
+  }
 };
 
+/*
+ * Allocator for builders in pack functions, it counts how many times
+ * builder buffer had to grow. Builder uses default allocator when
+ * statistics are disabled.
+ */
+
+#ifdef FLATBOOBS_ENABLE_STATS
+
+class CountingAllocator : public flatbuffers::DefaultAllocator {
+public:
+  uint8_t *reallocate_downward(uint8_t *_old_p, size_t _old_size,
+                               size_t _new_size, size_t _in_use_back,
+                               size_t _in_use_front) override {
+    reallocations_++;
+    return flatbuffers::DefaultAllocator::reallocate_downward(
+        _old_p, _old_size, _new_size, _in_use_back, _in_use_front);
+  }
+
+  size_t reallocations() const noexcept { return reallocations_; }
+
+private:
+  size_t reallocations_ = 0;
+};
+
+class BuilderAllocator {
+public:
+  flatbuffers::Allocator *get() noexcept { return &allocator_; }
+  size_t reallocations() const noexcept { return allocator_.reallocations(); }
+
+private:
+  CountingAllocator allocator_;
+};
+
+#else // FLATBOOBS_ENABLE_STATS
+
+class BuilderAllocator {
+public:
+  constexpr flatbuffers::Allocator *get() const noexcept { return nullptr; }
+  constexpr size_t reallocations() const noexcept { return 0; }
+};
+
+#endif // FLATBOOBS_ENABLE_STATS
+
 } // namespace flatboobs
 
 #endif // FLATBOOBS_BUILDER_HPP
@@ -22,6 +22,10 @@ class key_error : public std::runtime_error {
   using std::runtime_error::runtime_error;
 };
 
+class archive_error : public std::runtime_error {
+  using std::runtime_error::runtime_error;
+};
+
 } // namespace flatboobs
 
 #endif // FLATBOOBS_EXCEPTIONS_HPP
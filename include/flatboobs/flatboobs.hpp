@@ -3,9 +3,13 @@
 
 #include <flatbuffers/flatbuffers.h>
 
+#include <flatboobs/batch.hpp>
 #include <flatboobs/builder.hpp>
 #include <flatboobs/exceptions.hpp>
 #include <flatboobs/message.hpp>
+#include <flatboobs/msgpack.hpp>
+#include <flatboobs/nested.hpp>
+#include <flatboobs/stats.hpp>
 #include <flatboobs/types.hpp>
 #include <flatboobs/vector.hpp>
 
@@ -13,6 +17,8 @@ namespace flatboobs {
 
 template <typename T> Message pack(T _table) {
 
+  stats::record<T>(stats::Metric::packs);
+
   const Message *source_message = _table.source_message();
   if (source_message) {
     content_id_t source_content_id =
@@ -21,7 +27,10 @@ template <typename T> Message pack(T _table) {
       return Message{*source_message};
   }
 
-  flatbuffers::FlatBufferBuilder fbb{1024};
+  stats::ScopedTimer<T> timer{stats::Metric::pack_time_ns};
+
+  BuilderAllocator allocator{};
+  flatbuffers::FlatBufferBuilder fbb{1024, allocator.get()};
   BuilderContext context{&fbb};
 
   _table.build(context, true);
@@ -30,11 +39,43 @@ template <typename T> Message pack(T _table) {
   built_message.steal_from_builder(fbb);
   Message message{std::move(built_message)};
 
+  stats::record<T>(stats::Metric::reallocations, allocator.reallocations());
+  stats::record<T>(stats::Metric::message_size, message.size());
+
   return message;
 }
 
 template <typename T> T unpack(Message _message) { return T(_message); }
 
+// Table packed into bytes of nested_flatbuffer field, table unpacked
+// from message root is embedded without re-serializing.
+template <typename T> Vector<uint8_t> nested_flatbuffer(const T &_table) {
+  return nested_flatbuffer(pack(_table));
+}
+
+template <typename T>
+void to_msgpack(const Message &_message, std::vector<uint8_t> &_buffer) {
+  _buffer.clear();
+  msgpack::Writer writer{_buffer};
+  T::to_msgpack(_message, writer);
+}
+
+template <typename T> Message from_msgpack(std::string_view _data) {
+
+  msgpack::Reader reader{_data};
+
+  flatbuffers::FlatBufferBuilder fbb{1024};
+  BuilderContext context{&fbb};
+
+  T::from_msgpack(reader, context, true);
+
+  BuiltMessage built_message{};
+  built_message.steal_from_builder(fbb);
+  Message message{std::move(built_message)};
+
+  return message;
+}
+
 } // namespace flatboobs
 
 #endif // FLATBOOBS_FLATBOOBS_HPP
@@ -145,6 +145,27 @@ private:
   std::shared_ptr<const concept_t> self_;
 };
 
+/*
+ * Part of other message buffer, keeps whole buffer alive.
+ */
+
+class MessageSlice {
+public:
+  MessageSlice(Message _parent, size_t _offset, size_t _size)
+      : parent_{std::move(_parent)}, offset_{_offset}, size_{_size} {
+    if (_offset + _size > parent_.size())
+      throw std::out_of_range("Message slice out of range");
+  }
+
+  const std::byte *data() const { return parent_.data() + offset_; }
+  size_t size() const { return size_; }
+
+private:
+  Message parent_;
+  size_t offset_;
+  size_t size_;
+};
+
 class BuiltMessage {
 public:
   BuiltMessage() : size_{0}, offset_{0}, data_{nullptr} {}
@@ -0,0 +1,439 @@
+#ifndef FLATBOOBS_MSGPACK_HPP_
+#define FLATBOOBS_MSGPACK_HPP_
+
+#include <cstring>
+#include <flatboobs/exceptions.hpp>
+#include <limits>
+#include <string_view>
+#include <type_traits>
+#include <vector>
+
+namespace flatboobs {
+namespace msgpack {
+
+/*
+ * Writer
+ * Appends MessagePack encoded values to reusable buffer.
+ */
+
+class Writer {
+public:
+  using buffer_type = std::vector<uint8_t>;
+
+  explicit Writer(buffer_type &_buffer) noexcept : buffer_{_buffer} {}
+
+  buffer_type &buffer() const noexcept { return buffer_; }
+
+  void nil() { buffer_.push_back(0xc0); }
+
+  void map(size_t _size) {
+    if (_size < 16)
+      buffer_.push_back(0x80 | uint8_t(_size));
+    else if (_size <= 0xffff)
+      put_big_endian(0xde, uint16_t(_size));
+    else
+      put_big_endian(0xdf, uint32_t(_size));
+  }
+
+  void array(size_t _size) {
+    if (_size < 16)
+      buffer_.push_back(0x90 | uint8_t(_size));
+    else if (_size <= 0xffff)
+      put_big_endian(0xdc, uint16_t(_size));
+    else
+      put_big_endian(0xdd, uint32_t(_size));
+  }
+
+  void str(std::string_view _str) {
+    size_t size = _str.size();
+    if (size < 32)
+      buffer_.push_back(0xa0 | uint8_t(size));
+    else if (size <= 0xff)
+      put_big_endian(0xd9, uint8_t(size));
+    else if (size <= 0xffff)
+      put_big_endian(0xda, uint16_t(size));
+    else
+      put_big_endian(0xdb, uint32_t(size));
+    put_raw(_str.data(), size);
+  }
+
+  void bin(const void *_data, size_t _size) {
+    if (_size <= 0xff)
+      put_big_endian(0xc4, uint8_t(_size));
+    else if (_size <= 0xffff)
+      put_big_endian(0xc5, uint16_t(_size));
+    else
+      put_big_endian(0xc6, uint32_t(_size));
+    put_raw(_data, _size);
+  }
+
+  template <typename T> void value(T _value) {
+    using value_type = std::decay_t<T>;
+    if constexpr (std::is_enum_v<value_type>)
+      value(static_cast<std::underlying_type_t<value_type>>(_value));
+    else if constexpr (std::is_same_v<value_type, bool>)
+      buffer_.push_back(_value ? 0xc3 : 0xc2);
+    else if constexpr (std::is_same_v<value_type, float>)
+      put_big_endian(0xca, _value);
+    else if constexpr (std::is_same_v<value_type, double>)
+      put_big_endian(0xcb, _value);
+    else if constexpr (std::is_signed_v<value_type>)
+      put_int(int64_t(_value));
+    else if constexpr (std::is_unsigned_v<value_type>)
+      put_uint(uint64_t(_value));
+    else
+      static_assert(!std::is_same_v<value_type, value_type>,
+                    "Unsupported value type");
+  }
+
+private:
+  void put_uint(uint64_t _value) {
+    if (_value < 0x80)
+      buffer_.push_back(uint8_t(_value));
+    else if (_value <= 0xff)
+      put_big_endian(0xcc, uint8_t(_value));
+    else if (_value <= 0xffff)
+      put_big_endian(0xcd, uint16_t(_value));
+    else if (_value <= 0xffffffff)
+      put_big_endian(0xce, uint32_t(_value));
+    else
+      put_big_endian(0xcf, _value);
+  }
+
+  void put_int(int64_t _value) {
+    if (_value >= 0)
+      put_uint(uint64_t(_value));
+    else if (_value >= -32)
+      buffer_.push_back(uint8_t(_value));
+    else if (_value >= INT8_MIN)
+      put_big_endian(0xd0, int8_t(_value));
+    else if (_value >= INT16_MIN)
+      put_big_endian(0xd1, int16_t(_value));
+    else if (_value >= INT32_MIN)
+      put_big_endian(0xd2, int32_t(_value));
+    else
+      put_big_endian(0xd3, _value);
+  }
+
+  template <typename T> void put_big_endian(uint8_t _tag, T _value) {
+    uint8_t bytes[sizeof(T)];
+    std::memcpy(bytes, &_value, sizeof(T));
+    size_t pos = buffer_.size();
+    buffer_.resize(pos + 1 + sizeof(T));
+    buffer_[pos] = _tag;
+    for (size_t i = 0; i < sizeof(T); i++)
+      buffer_[pos + 1 + i] = bytes[is_little_endian() ? sizeof(T) - 1 - i : i];
+  }
+
+  void put_raw(const void *_data, size_t _size) {
+    size_t pos = buffer_.size();
+    buffer_.resize(pos + _size);
+    std::memcpy(buffer_.data() + pos, _data, _size);
+  }
+
+  static bool is_little_endian() noexcept {
+    const uint16_t probe = 1;
+    return *reinterpret_cast<const uint8_t *>(&probe) == 1;
+  }
+
+  buffer_type &buffer_;
+};
+
+/*
+ * Reader
+ * Sequentially decodes MessagePack values from memory.
+ */
+
+class Reader {
+public:
+  Reader(const void *_data, size_t _size) noexcept
+      : ptr_{reinterpret_cast<const uint8_t *>(_data)}, end_{ptr_ + _size} {}
+  explicit Reader(std::string_view _data) noexcept
+      : Reader(_data.data(), _data.size()) {}
+
+  bool at_end() const noexcept { return ptr_ == end_; }
+
+  // Consumes nil and returns true if next value is nil.
+  bool nil() {
+    if (peek() != 0xc0)
+      return false;
+    ptr_++;
+    return true;
+  }
+
+  size_t map() {
+    uint8_t tag = take();
+    if ((tag & 0xf0) == 0x80)
+      return tag & 0x0f;
+    if (tag == 0xde)
+      return check_count(get_big_endian<uint16_t>(), 2);
+    if (tag == 0xdf)
+      return check_count(get_big_endian<uint32_t>(), 2);
+    throw unpack_error("MessagePack map expected");
+  }
+
+  size_t array() {
+    uint8_t tag = take();
+    if ((tag & 0xf0) == 0x90)
+      return check_count(tag & 0x0f, 1);
+    if (tag == 0xdc)
+      return check_count(get_big_endian<uint16_t>(), 1);
+    if (tag == 0xdd)
+      return check_count(get_big_endian<uint32_t>(), 1);
+    throw unpack_error("MessagePack array expected");
+  }
+
+  bool is_bin() const { return peek() >= 0xc4 && peek() <= 0xc6; }
+
+  std::string_view bin() {
+    uint8_t tag = take();
+    size_t size;
+    if (tag == 0xc4)
+      size = get_big_endian<uint8_t>();
+    else if (tag == 0xc5)
+      size = get_big_endian<uint16_t>();
+    else if (tag == 0xc6)
+      size = get_big_endian<uint32_t>();
+    else
+      throw unpack_error("MessagePack bin expected");
+    return get_raw(size);
+  }
+
+  std::string_view str() {
+    uint8_t tag = take();
+    size_t size;
+    if ((tag & 0xe0) == 0xa0)
+      size = tag & 0x1f;
+    else if (tag == 0xd9)
+      size = get_big_endian<uint8_t>();
+    else if (tag == 0xda)
+      size = get_big_endian<uint16_t>();
+    else if (tag == 0xdb)
+      size = get_big_endian<uint32_t>();
+    else
+      throw unpack_error("MessagePack string expected");
+    return get_raw(size);
+  }
+
+  template <typename T> T value() {
+    using value_type = std::decay_t<T>;
+    if constexpr (std::is_enum_v<value_type>) {
+      return static_cast<value_type>(
+          value<std::underlying_type_t<value_type>>());
+    } else if constexpr (std::is_same_v<value_type, bool>) {
+      uint8_t tag = take();
+      if (tag == 0xc2 || tag == 0xc3)
+        return tag == 0xc3;
+      throw unpack_error("MessagePack bool expected");
+    } else if constexpr (std::is_floating_point_v<value_type>) {
+      uint8_t tag = peek();
+      if (tag == 0xca) {
+        ptr_++;
+        return value_type(get_big_endian<float>());
+      }
+      if (tag == 0xcb) {
+        ptr_++;
+        return value_type(get_big_endian<double>());
+      }
+      if (tag == 0xcf) {
+        ptr_++;
+        return value_type(get_big_endian<uint64_t>());
+      }
+      return value_type(get_int());
+    } else if constexpr (std::is_integral_v<value_type>) {
+      return get_integer<value_type>();
+    } else {
+      static_assert(!std::is_same_v<value_type, value_type>,
+                    "Unsupported value type");
+    }
+  }
+
+  // Skips next value including all nested values.
+  void skip() {
+    size_t pending = 1;
+    while (pending--) {
+      uint8_t tag = take();
+      if (tag < 0x80 || tag >= 0xe0 || tag == 0xc0 || tag == 0xc2 ||
+          tag == 0xc3)
+        continue;
+      if ((tag & 0xf0) == 0x80)
+        pending += 2 * (tag & 0x0f);
+      else if ((tag & 0xf0) == 0x90)
+        pending += tag & 0x0f;
+      else if ((tag & 0xe0) == 0xa0)
+        get_raw(tag & 0x1f);
+      else
+        switch (tag) {
+        case 0xc4:
+        case 0xd9:
+          get_raw(get_big_endian<uint8_t>());
+          break;
+        case 0xc5:
+        case 0xda:
+          get_raw(get_big_endian<uint16_t>());
+          break;
+        case 0xc6:
+        case 0xdb:
+          get_raw(get_big_endian<uint32_t>());
+          break;
+        case 0xc7:
+          get_raw(get_big_endian<uint8_t>() + 1);
+          break;
+        case 0xc8:
+          get_raw(get_big_endian<uint16_t>() + 1);
+          break;
+        case 0xc9:
+          get_raw(size_t(get_big_endian<uint32_t>()) + 1);
+          break;
+        case 0xcc:
+        case 0xd0:
+          get_raw(1);
+          break;
+        case 0xcd:
+        case 0xd1:
+          get_raw(2);
+          break;
+        case 0xca:
+        case 0xce:
+        case 0xd2:
+          get_raw(4);
+          break;
+        case 0xcb:
+        case 0xcf:
+        case 0xd3:
+          get_raw(8);
+          break;
+        case 0xd4:
+          get_raw(2);
+          break;
+        case 0xd5:
+          get_raw(3);
+          break;
+        case 0xd6:
+          get_raw(5);
+          break;
+        case 0xd7:
+          get_raw(9);
+          break;
+        case 0xd8:
+          get_raw(17);
+          break;
+        case 0xdc:
+          pending += get_big_endian<uint16_t>();
+          break;
+        case 0xdd:
+          pending += get_big_endian<uint32_t>();
+          break;
+        case 0xde:
+          pending += 2 * size_t(get_big_endian<uint16_t>());
+          break;
+        case 0xdf:
+          pending += 2 * size_t(get_big_endian<uint32_t>());
+          break;
+        default:
+          throw unpack_error("Malformed MessagePack data");
+        }
+    }
+  }
+
+private:
+  uint8_t peek() const {
+    if (ptr_ >= end_)
+      throw unpack_error("Unexpected end of MessagePack data");
+    return *ptr_;
+  }
+
+  uint8_t take() {
+    uint8_t tag = peek();
+    ptr_++;
+    return tag;
+  }
+
+  // Every item takes at least _item_size bytes, so length from data
+  // could not exceed size of the rest of data.
+  size_t check_count(size_t _count, size_t _item_size) const {
+    if (_count > size_t(end_ - ptr_) / _item_size)
+      throw unpack_error("MessagePack length exceeds data size");
+    return _count;
+  }
+
+  template <typename T> T get_integer() {
+    using limits = std::numeric_limits<T>;
+    if (peek() == 0xcf) {
+      ptr_++;
+      uint64_t value = get_big_endian<uint64_t>();
+      if (value > uint64_t(limits::max()))
+        throw unpack_error("MessagePack integer out of range");
+      return T(value);
+    }
+    int64_t value = get_int();
+    bool in_range;
+    if constexpr (std::is_signed_v<T>)
+      in_range = value >= int64_t(limits::min()) &&
+                 value <= int64_t(limits::max());
+    else
+      in_range = value >= 0 && uint64_t(value) <= uint64_t(limits::max());
+    if (!in_range)
+      throw unpack_error("MessagePack integer out of range");
+    return T(value);
+  }
+
+  int64_t get_int() {
+    uint8_t tag = take();
+    if (tag < 0x80)
+      return tag;
+    if (tag >= 0xe0)
+      return int8_t(tag);
+    switch (tag) {
+    case 0xcc:
+      return get_big_endian<uint8_t>();
+    case 0xcd:
+      return get_big_endian<uint16_t>();
+    case 0xce:
+      return get_big_endian<uint32_t>();
+    case 0xcf:
+      return int64_t(get_big_endian<uint64_t>());
+    case 0xd0:
+      return get_big_endian<int8_t>();
+    case 0xd1:
+      return get_big_endian<int16_t>();
+    case 0xd2:
+      return get_big_endian<int32_t>();
+    case 0xd3:
+      return get_big_endian<int64_t>();
+    }
+    throw unpack_error("MessagePack integer expected");
+  }
+
+  template <typename T> T get_big_endian() {
+    const uint8_t *src = reinterpret_cast<const uint8_t *>(
+        get_raw(sizeof(T)).data());
+    uint8_t bytes[sizeof(T)];
+    for (size_t i = 0; i < sizeof(T); i++)
+      bytes[i] = src[is_little_endian() ? sizeof(T) - 1 - i : i];
+    T value;
+    std::memcpy(&value, bytes, sizeof(T));
+    return value;
+  }
+
+  std::string_view get_raw(size_t _size) {
+    if (size_t(end_ - ptr_) < _size)
+      throw unpack_error("Unexpected end of MessagePack data");
+    std::string_view raw{reinterpret_cast<const char *>(ptr_), _size};
+    ptr_ += _size;
+    return raw;
+  }
+
+  static bool is_little_endian() noexcept {
+    const uint16_t probe = 1;
+    return *reinterpret_cast<const uint8_t *>(&probe) == 1;
+  }
+
+  const uint8_t *ptr_;
+  const uint8_t *end_;
+};
+
+} // namespace msgpack
+} // namespace flatboobs
+
+#endif // FLATBOOBS_MSGPACK_HPP_
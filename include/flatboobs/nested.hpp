@@ -0,0 +1,92 @@
+#ifndef FLATBOOBS_NESTED_HPP_
+#define FLATBOOBS_NESTED_HPP_
+
+#include <flatboobs/builder.hpp>
+#include <flatboobs/message.hpp>
+#include <flatboobs/stats.hpp>
+#include <flatboobs/types.hpp>
+#include <flatboobs/vector.hpp>
+#include <flatbuffers/flatbuffers.h>
+#include <mutex>
+#include <optional>
+
+namespace flatboobs {
+
+/*
+ * NestedRoot
+ * Lazily unpacked root of nested_flatbuffer field.
+ *
+ * Root table is a view of field bytes and keeps parent message alive,
+ * nested message is verified on first access only. Failed verification
+ * is not cached, every access throws unpack_error.
+ */
+
+template <typename T> class NestedRoot {
+public:
+  NestedRoot() noexcept {}
+
+  // Cached root is not copied, it is cheap to unpack it again.
+  NestedRoot(const NestedRoot &) noexcept {}
+  NestedRoot &operator=(const NestedRoot &) noexcept { return *this; }
+
+  // Bytes are called once, returns Vector<uint8_t> of field
+  template <typename F> T get(F _bytes) const {
+    std::call_once(once_, [this, &_bytes]() {
+      Vector<uint8_t> bytes = _bytes();
+      root_.emplace(bytes.empty() ? T{} : T(Message{std::move(bytes)}));
+    });
+    return *root_;
+  }
+
+private:
+  mutable std::once_flag once_;
+  mutable std::optional<T> root_;
+};
+
+/*
+ * Bytes of nested_flatbuffer field that embed already packed message
+ * without copy, message is copied only into builder when parent is packed.
+ */
+
+inline Vector<uint8_t> nested_flatbuffer(Message _message) {
+  return Vector<uint8_t>{detail::vector::message_view_t{},
+                         std::move(_message)};
+}
+
+/*
+ * Builds bytes of nested_flatbuffer field, nested message is aligned
+ * the same way as root message, so it could be accessed in place.
+ */
+
+inline flatbuffers::Offset<flatbuffers::Vector<uint8_t>>
+build_nested_flatbuffer(BuilderContext &_context, const uint8_t *_data,
+                        size_t _size) {
+
+  flatbuffers::FlatBufferBuilder *fbb = _context.builder();
+  fbb->ForceVectorAlignment(_size, sizeof(uint8_t),
+                            sizeof(flatbuffers::largest_scalar_t));
+  return fbb->CreateVector(_data, _size);
+}
+
+inline flatbuffers::Offset<flatbuffers::Vector<uint8_t>>
+build_nested_flatbuffer(BuilderContext &_context,
+                        const Vector<uint8_t> &_bytes) {
+
+  if (!_bytes.size())
+    return 0;
+
+  auto it = _context.nested_offset_map().find(_bytes.content_id());
+  if (it != _context.nested_offset_map().end()) {
+    stats::record<Vector<uint8_t>>(stats::Metric::dedup_hits);
+    return flatbuffers::Offset<flatbuffers::Vector<uint8_t>>{it->second};
+  }
+
+  auto offset = build_nested_flatbuffer(_context, _bytes.data(), _bytes.size());
+  _context.nested_offset_map()[_bytes.content_id()] = offset.o;
+
+  return offset;
+}
+
+} // namespace flatboobs
+
+#endif // FLATBOOBS_NESTED_HPP_
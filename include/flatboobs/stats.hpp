@@ -0,0 +1,314 @@
+#ifndef FLATBOOBS_STATS_HPP_
+#define FLATBOOBS_STATS_HPP_
+
+#include <array>
+#include <cstdint>
+#include <string_view>
+
+#ifdef FLATBOOBS_ENABLE_STATS
+#include <atomic>
+#include <chrono>
+#include <list>
+#include <map>
+#include <mutex>
+#include <string>
+#endif
+
+/*
+ * Pack/unpack statistics
+ *
+ * Compiled in only when FLATBOOBS_ENABLE_STATS is defined, the same way
+ * for generated code and its consumers. Otherwise only hooks are declared,
+ * they are discarded at compile time and ScopedTimer is an empty object.
+ */
+
+namespace flatboobs {
+namespace stats {
+
+#ifdef FLATBOOBS_ENABLE_STATS
+inline constexpr bool enabled = true;
+#else
+inline constexpr bool enabled = false;
+#endif
+
+enum class Metric : size_t {
+  // Counters
+  packs,
+  unpacks,
+  verify_failures,
+  builds,
+  dedup_hits,
+  reallocations,
+  // Histograms
+  pack_time_ns,
+  verify_time_ns,
+  message_size,
+};
+
+inline constexpr size_t counters_count = 6;
+inline constexpr size_t histograms_count = 3;
+
+constexpr bool is_histogram(Metric _metric) noexcept {
+  return size_t(_metric) >= counters_count;
+}
+
+constexpr std::string_view metric_name(Metric _metric) noexcept {
+  constexpr std::array<std::string_view, counters_count + histograms_count>
+      names{"packs",         "unpacks",        "verify_failures",
+            "builds",        "dedup_hits",     "reallocations",
+            "pack_time_ns",  "verify_time_ns", "message_size"};
+  return names[size_t(_metric)];
+}
+
+#ifdef FLATBOOBS_ENABLE_STATS
+
+struct Sample {
+  std::string_view type_name;
+  Metric metric;
+  uint64_t value;
+};
+
+// Called for every recorded value with context given to set_callback,
+// could be called from any thread.
+using callback_t = void (*)(const Sample &, void *) noexcept;
+
+namespace detail {
+struct Callback {
+  callback_t function;
+  void *context;
+};
+
+inline std::atomic<const Callback *> &callback() noexcept {
+  static std::atomic<const Callback *> instance{nullptr};
+  return instance;
+}
+} // namespace detail
+
+// Function and context are published together. Previous pairs are kept,
+// samples recorded concurrently could still use them.
+inline void set_callback(callback_t _callback, void *_context = nullptr) {
+  static std::mutex mutex{};
+  static std::list<detail::Callback> callbacks{};
+
+  const detail::Callback *callback = nullptr;
+  if (_callback) {
+    std::lock_guard<std::mutex> lock{mutex};
+    for (const auto &item : callbacks)
+      if (item.function == _callback && item.context == _context)
+        callback = &item;
+    if (!callback)
+      callback = &callbacks.emplace_back(detail::Callback{_callback, _context});
+  }
+  detail::callback().store(callback, std::memory_order_release);
+}
+
+/*
+ * Histogram
+ * Bucket N counts values in range [2^(N-1), 2^N), bucket 0 counts zeros.
+ */
+
+class Histogram {
+public:
+  static constexpr size_t buckets_count = 65;
+
+  Histogram() noexcept { reset(); }
+
+  static constexpr size_t bucket(uint64_t _value) noexcept {
+    size_t index = 0;
+    while (_value) {
+      _value >>= 1;
+      index++;
+    }
+    return index;
+  }
+  static constexpr uint64_t upper_bound(size_t _bucket) noexcept {
+    return _bucket >= 64 ? ~uint64_t(0) : (uint64_t(1) << _bucket) - 1;
+  }
+
+  void record(uint64_t _value) noexcept {
+    buckets_[bucket(_value)].fetch_add(1, std::memory_order_relaxed);
+    count_.fetch_add(1, std::memory_order_relaxed);
+    sum_.fetch_add(_value, std::memory_order_relaxed);
+  }
+
+  uint64_t count() const noexcept {
+    return count_.load(std::memory_order_relaxed);
+  }
+  uint64_t sum() const noexcept { return sum_.load(std::memory_order_relaxed); }
+  uint64_t at(size_t _bucket) const noexcept {
+    return buckets_[_bucket].load(std::memory_order_relaxed);
+  }
+
+  // Upper bound of bucket that contains given quantile.
+  uint64_t quantile(double _quantile) const noexcept {
+    uint64_t total = count();
+    uint64_t seen = 0;
+    for (size_t i = 0; i < buckets_count; i++) {
+      seen += at(i);
+      if (seen && seen >= _quantile * total)
+        return upper_bound(i);
+    }
+    return 0;
+  }
+
+  void reset() noexcept {
+    for (auto &bucket : buckets_)
+      bucket.store(0, std::memory_order_relaxed);
+    count_.store(0, std::memory_order_relaxed);
+    sum_.store(0, std::memory_order_relaxed);
+  }
+
+private:
+  std::array<std::atomic<uint64_t>, buckets_count> buckets_;
+  std::atomic<uint64_t> count_;
+  std::atomic<uint64_t> sum_;
+};
+
+/*
+ * TypeStats
+ * Counters and histograms of one table type.
+ */
+
+class TypeStats {
+public:
+  explicit TypeStats(std::string_view _type_name) : type_name_{_type_name} {
+    reset();
+  }
+
+  std::string_view type_name() const noexcept { return type_name_; }
+
+  uint64_t counter(Metric _metric) const noexcept {
+    return counters_[size_t(_metric)].load(std::memory_order_relaxed);
+  }
+  const Histogram &histogram(Metric _metric) const noexcept {
+    return histograms_[size_t(_metric) - counters_count];
+  }
+
+  void record(Metric _metric, uint64_t _value = 1) noexcept {
+    if (is_histogram(_metric))
+      histograms_[size_t(_metric) - counters_count].record(_value);
+    else
+      counters_[size_t(_metric)].fetch_add(_value, std::memory_order_relaxed);
+
+    const detail::Callback *callback =
+        detail::callback().load(std::memory_order_acquire);
+    if (callback)
+      callback->function(Sample{type_name_, _metric, _value},
+                         callback->context);
+  }
+
+  void reset() noexcept {
+    for (auto &counter : counters_)
+      counter.store(0, std::memory_order_relaxed);
+    for (auto &histogram : histograms_)
+      histogram.reset();
+  }
+
+private:
+  const std::string type_name_;
+  std::array<std::atomic<uint64_t>, counters_count> counters_;
+  std::array<Histogram, histograms_count> histograms_;
+};
+
+/*
+ * Registry
+ */
+
+namespace detail {
+struct Registry {
+  std::mutex mutex;
+  std::map<std::string, TypeStats, std::less<>> types;
+};
+
+inline Registry &registry() {
+  static Registry instance{};
+  return instance;
+}
+} // namespace detail
+
+// Returned reference stays valid for program lifetime.
+inline TypeStats &type_stats(std::string_view _type_name) {
+  detail::Registry &registry = detail::registry();
+  std::lock_guard<std::mutex> lock{registry.mutex};
+  auto it = registry.types.find(_type_name);
+  if (it == registry.types.end())
+    it = registry.types
+             .emplace(std::piecewise_construct,
+                      std::forward_as_tuple(_type_name),
+                      std::forward_as_tuple(_type_name))
+             .first;
+  return it->second;
+}
+
+template <typename T> TypeStats &type_stats() {
+  static TypeStats &instance = type_stats(T::fully_qualified_name());
+  return instance;
+}
+
+// Calls function with every registered TypeStats.
+template <typename F> void for_each(F _function) {
+  detail::Registry &registry = detail::registry();
+  std::lock_guard<std::mutex> lock{registry.mutex};
+  for (auto &item : registry.types)
+    _function(static_cast<const TypeStats &>(item.second));
+}
+
+inline void reset() {
+  detail::Registry &registry = detail::registry();
+  std::lock_guard<std::mutex> lock{registry.mutex};
+  for (auto &item : registry.types)
+    item.second.reset();
+}
+
+/*
+ * Hooks
+ */
+
+// Registering type could fail (mutex, allocation), sample is dropped then,
+// hooks never throw into pack/unpack code.
+template <typename T>
+inline void record(Metric _metric, uint64_t _value = 1) noexcept {
+  try {
+    type_stats<T>().record(_metric, _value);
+  } catch (...) {
+  }
+}
+
+template <typename T> class ScopedTimer {
+public:
+  explicit ScopedTimer(Metric _metric) noexcept
+      : metric_{_metric}, start_{std::chrono::steady_clock::now()} {}
+  ~ScopedTimer() {
+    auto elapsed = std::chrono::steady_clock::now() - start_;
+    record<T>(
+        metric_,
+        std::chrono::duration_cast<std::chrono::nanoseconds>(elapsed).count());
+  }
+
+  ScopedTimer(const ScopedTimer &) = delete;
+  ScopedTimer &operator=(const ScopedTimer &) = delete;
+
+private:
+  Metric metric_;
+  std::chrono::steady_clock::time_point start_;
+};
+
+#else // FLATBOOBS_ENABLE_STATS
+
+/*
+ * Hooks
+ */
+
+template <typename T> inline void record(Metric, uint64_t = 1) noexcept {}
+
+template <typename T> class ScopedTimer {
+public:
+  explicit ScopedTimer(Metric) noexcept {}
+};
+
+#endif // FLATBOOBS_ENABLE_STATS
+
+} // namespace stats
+} // namespace flatboobs
+
+#endif // FLATBOOBS_STATS_HPP_
@@ -3,9 +3,13 @@
 
 #include <flatboobs/builder.hpp>
 #include <flatboobs/message.hpp>
+#include <flatboobs/stats.hpp>
 #include <flatboobs/types.hpp>
+#include <cstring>
 #include <flatbuffers/flatbuffers.h>
+#include <iterator>
 #include <memory>
+#include <stdexcept>
 #include <string_view>
 #include <type_traits>
 #include <vector>
@@ -14,11 +18,35 @@ namespace flatboobs {
 
 template <typename T> class Vector;
 
+// Tag of Vector constructors that view caller's array without copy
+struct view_t {};
+inline constexpr view_t view{};
+
 namespace detail {
 namespace vector {
 
 template <typename T> struct options;
 
+template <typename It>
+using iterator_category_t = typename std::iterator_traits<It>::iterator_category;
+
+template <typename It>
+using enable_if_iterator_t = std::void_t<iterator_category_t<It>>;
+
+template <typename F, typename S>
+using enable_if_generator_t = std::enable_if_t<std::is_invocable_v<F &, S>>;
+
+// Tag of owning impl constructors that fill storage from generator
+struct generate_t {};
+
+template <typename C, typename F> C generate(size_t _size, F &_generator) {
+  C container{};
+  container.reserve(_size);
+  for (size_t i = 0; i < _size; i++)
+    container.emplace_back(_generator(i));
+  return container;
+}
+
 /*
  * Impl
  */
@@ -48,6 +76,11 @@ public:
   OwningImpl() noexcept : vec_{} {}
   OwningImpl(const std::vector<value_type> &_vec) : vec_{_vec} {}
   OwningImpl(std::vector<value_type> &&_vec) noexcept : vec_{std::move(_vec)} {}
+  template <typename It, typename = enable_if_iterator_t<It>>
+  OwningImpl(It _first, It _last) : vec_(_first, _last) {}
+  template <typename F>
+  OwningImpl(generate_t, size_type _size, F &_generator)
+      : vec_{generate<std::vector<value_type>>(_size, _generator)} {}
 
   return_value_type at(size_type _pos) const override {
     return return_value_type(vec_.at(_pos));
@@ -75,6 +108,11 @@ public:
   OwningDirectImpl(const std::vector<value_type> &_vec) : vec_{_vec} {}
   OwningDirectImpl(std::vector<value_type> &&_vec) noexcept
       : vec_{std::move(_vec)} {}
+  template <typename It, typename = enable_if_iterator_t<It>>
+  OwningDirectImpl(It _first, It _last) : vec_(_first, _last) {}
+  template <typename F>
+  OwningDirectImpl(generate_t, size_type _size, F &_generator)
+      : vec_{generate<std::vector<value_type>>(_size, _generator)} {}
 
   return_value_type at(size_type _pos) const override { return vec_.at(_pos); }
   size_type size() const noexcept override { return vec_.size(); }
@@ -99,8 +137,13 @@ public:
   static_assert(std::is_same_v<data_ptr_type, const uint8_t *>);
 
   OwningBoolsImpl() noexcept : vec_{} {}
-  OwningBoolsImpl(const std::vector<bool> &_vec) : vec_{convert(_vec)} {}
-  OwningBoolsImpl(std::vector<bool> &&_vec) : vec_{convert(_vec)} {}
+  OwningBoolsImpl(const std::vector<bool> &_vec)
+      : vec_(_vec.begin(), _vec.end()) {}
+  template <typename It, typename = enable_if_iterator_t<It>>
+  OwningBoolsImpl(It _first, It _last) : vec_(_first, _last) {}
+  template <typename F>
+  OwningBoolsImpl(generate_t, size_type _size, F &_generator)
+      : vec_{generate<std::vector<uint8_t>>(_size, _generator)} {}
 
   return_value_type at(size_type _pos) const override {
     return bool(vec_.at(_pos));
@@ -112,16 +155,40 @@ public:
   }
 
 private:
-  static std::vector<uint8_t> convert(const std::vector<bool> &_src) {
-    std::vector<uint8_t> tmp{};
-    std::transform(_src.begin(), _src.end(), std::back_inserter(tmp),
-                   [](bool v) { return uint8_t(v); });
-    return tmp;
-  };
-
   std::vector<uint8_t> vec_;
 };
 
+// Non-owning view of caller's array
+template <typename V> class SpanImpl : public AbstractImpl<V> {
+public:
+  using data_ptr_type = typename V::data_ptr_type;
+  using return_value_type = typename V::return_value_type;
+  using size_type = typename V::size_type;
+  using value_type = typename V::value_type;
+  static_assert(sizeof(std::remove_pointer_t<data_ptr_type>) ==
+                sizeof(value_type));
+
+  SpanImpl(const value_type *_data, size_type _size) noexcept
+      : data_{_data}, size_{_size} {}
+
+  return_value_type at(size_type _pos) const override {
+    if (_pos >= size_)
+      throw std::out_of_range("Vector index out of range");
+    return data_[_pos];
+  }
+  size_type size() const noexcept override { return size_; }
+  data_ptr_type data() const noexcept override {
+    return reinterpret_cast<data_ptr_type>(data_);
+  }
+  content_id_t content_id() const noexcept override {
+    return content_id_t(&data_);
+  }
+
+private:
+  const value_type *data_;
+  size_type size_;
+};
+
 template <typename V> class UnpackedScalarsImpl : public AbstractImpl<V> {
 public:
   using data_ptr_type = typename V::data_ptr_type;
@@ -214,6 +281,40 @@ private:
   const flatbuffers::Vector<fb_value_type> *fbvec_;
 };
 
+// Tag of constructors that view raw bytes of whole message
+struct message_view_t {};
+
+template <typename V> class MessageViewImpl : public AbstractImpl<V> {
+public:
+  using data_ptr_type = typename V::data_ptr_type;
+  using return_value_type = typename V::return_value_type;
+  using size_type = typename V::size_type;
+  using value_type = typename V::value_type;
+  static_assert(std::is_same_v<data_ptr_type, const value_type *>,
+                "Message view is available for vector of scalars only.");
+
+  MessageViewImpl(Message _message) noexcept : message_{std::move(_message)} {}
+
+  return_value_type at(size_type _pos) const override {
+    if (_pos >= size())
+      throw std::out_of_range("Vector index out of range");
+    return data()[_pos];
+  }
+  data_ptr_type data() const noexcept override {
+    return reinterpret_cast<data_ptr_type>(message_.data());
+  }
+
+  size_type size() const noexcept override {
+    return message_.size() / sizeof(value_type);
+  }
+  content_id_t content_id() const noexcept override {
+    return content_id_t(message_.data());
+  }
+
+private:
+  Message message_;
+};
+
 /*
  * Accesssor
  */
@@ -268,7 +369,28 @@ template <typename T, typename V> struct ScalarsBuilder {
                                         const Vector<T> &_vec) {
 
     flatbuffers::FlatBufferBuilder *fbb = _context.builder();
-    offset_type offset = fbb->CreateVector(_vec.data(), _vec.size());
+    const size_t size = _vec.size();
+    fb_value_type *data = nullptr;
+    offset_type offset = fbb->CreateUninitializedVector(size, &data);
+#if FLATBUFFERS_LITTLEENDIAN
+    std::memcpy(data, _vec.data(), size * sizeof(fb_value_type));
+#else
+    for (size_t i = 0; i < size; i++)
+      flatbuffers::WriteScalar(data + i, _vec.data()[i]);
+#endif
+
+    return offset;
+  }
+
+  template <typename F>
+  static inline const offset_type build(flatboobs::BuilderContext &_context,
+                                        size_t _size, F &_generator) {
+
+    flatbuffers::FlatBufferBuilder *fbb = _context.builder();
+    fb_value_type *data = nullptr;
+    offset_type offset = fbb->CreateUninitializedVector(_size, &data);
+    for (size_t i = 0; i < _size; i++)
+      flatbuffers::WriteScalar(data + i, fb_value_type(_generator(i)));
 
     return offset;
   }
@@ -278,6 +400,7 @@ template <typename T, typename V> struct StructsBuilder {
   using offset_type = typename V::offset_type;
   using data_ptr_type = typename V::data_ptr_type;
   using fb_value_type = typename V::fb_value_type;
+  using value_type = typename V::value_type;
 
   static_assert(std::is_same_v<data_ptr_type, fb_value_type>);
 
@@ -285,7 +408,23 @@ template <typename T, typename V> struct StructsBuilder {
                                         const Vector<T> &_vec) {
 
     flatbuffers::FlatBufferBuilder *fbb = _context.builder();
-    offset_type offset = fbb->CreateVectorOfStructs(_vec.data(), _vec.size());
+    const size_t size = _vec.size();
+    value_type *data = nullptr;
+    offset_type offset = fbb->CreateUninitializedVectorOfStructs(size, &data);
+    std::memcpy(data, _vec.data(), size * sizeof(value_type));
+
+    return offset;
+  }
+
+  template <typename F>
+  static inline const offset_type build(flatboobs::BuilderContext &_context,
+                                        size_t _size, F &_generator) {
+
+    flatbuffers::FlatBufferBuilder *fbb = _context.builder();
+    value_type *data = nullptr;
+    offset_type offset = fbb->CreateUninitializedVectorOfStructs(_size, &data);
+    for (size_t i = 0; i < _size; i++)
+      data[i] = _generator(i);
 
     return offset;
   }
@@ -299,17 +438,16 @@ template <typename T, typename V> struct TablesBuilder {
   static inline const offset_type build(flatboobs::BuilderContext &_context,
                                         const Vector<T> &_vec) {
 
-    using std::cbegin;
-    using std::cend;
-    using std::crbegin;
-    using std::crend;
-
     flatbuffers::FlatBufferBuilder *fbb = _context.builder();
-    std::vector<fb_value_type> item_offsets{};
-    for (auto iter = crbegin(_vec); iter < crend(_vec); iter++) {
-      item_offsets.push_back((*iter).build(_context));
+    // Items are built from last to first to be laid out in vector order.
+    const size_t size = _vec.size();
+    std::vector<fb_value_type> item_offsets(size);
+    for (size_t i = size; i-- > 0;) {
+      const fb_value_type item_offset = _vec[i].build(_context, false);
+      // Vector item can not be null, default table is built as empty one
+      item_offsets[i] =
+          item_offset.IsNull() ? _context.empty_table() : item_offset.o;
     }
-    std::reverse(begin(item_offsets), end(item_offsets));
     offset_type offset = fbb->CreateVector(item_offsets);
 
     return offset;
@@ -469,14 +607,17 @@ public:
     return *this;
   }
 
-  VectorIterator &operator+(difference_type _diff) {
+  VectorIterator operator+(difference_type _diff) const {
     VectorIterator tmp = *this;
     return tmp += _diff;
   }
-  VectorIterator &operator-(difference_type _diff) {
+  VectorIterator operator-(difference_type _diff) const {
     VectorIterator tmp = *this;
     return tmp -= _diff;
   }
+  difference_type operator-(const VectorIterator &_other) const {
+    return difference_type(index_) - difference_type(_other.index_);
+  }
 
   VectorIterator &operator++() {
     index_++;
@@ -576,6 +717,11 @@ public:
   using unpacked_impl_type = typename V::unpacked_impl_type;
   using value_type = typename V::value_type;
 
+  // Stats of all vector types are collected under one name
+  static constexpr std::string_view fully_qualified_name() noexcept {
+    return "flatboobs.Vector";
+  }
+
   Vector()
       : impl_{std::make_shared<const owning_impl_type>()}, accessor_{
                                                                impl_.get()} {}
@@ -583,7 +729,36 @@ public:
       : impl_{std::make_shared<const owning_impl_type>(_vec)},
         accessor_{impl_.get()} {}
   Vector(std::vector<T> &&_vec)
-      : impl_{std::make_shared<const owning_impl_type>(_vec)},
+      : impl_{std::make_shared<const owning_impl_type>(std::move(_vec))},
+        accessor_{impl_.get()} {}
+  Vector(const value_type *_data, size_type _size)
+      : Vector(_data, _data + _size) {}
+  // Non-owning view of caller's array, array has to outlive the vector and
+  // tables that hold it, items are copied only when packed.
+  template <typename D = data_ptr_type,
+            typename = std::enable_if_t<!std::is_same_v<D, void *>>>
+  Vector(view_t, const value_type *_data, size_type _size)
+      : impl_{std::make_shared<const detail::vector::SpanImpl<V>>(_data,
+                                                                 _size)},
+        accessor_{impl_.get()} {}
+  template <typename It,
+            typename = detail::vector::enable_if_iterator_t<It>>
+  Vector(It _first, It _last)
+      : impl_{std::make_shared<const owning_impl_type>(_first, _last)},
+        accessor_{impl_.get()} {}
+  // Generator is called with index of every item in order
+  template <typename F,
+            typename = detail::vector::enable_if_generator_t<F, size_type>>
+  Vector(size_type _size, F _generator)
+      : impl_{std::make_shared<const owning_impl_type>(
+            detail::vector::generate_t{}, _size, _generator)},
+        accessor_{impl_.get()} {}
+  // Zero-copy view of whole message, e.g. bytes of nested flatbuffer
+  template <typename D = data_ptr_type,
+            typename = std::enable_if_t<std::is_same_v<D, const T *>>>
+  Vector(detail::vector::message_view_t, Message _message)
+      : impl_{std::make_shared<const detail::vector::MessageViewImpl<V>>(
+            std::move(_message))},
         accessor_{impl_.get()} {}
   template <typename... Ts>
   explicit Vector(Message _message, Ts... _args)
@@ -671,8 +846,10 @@ public:
       return 0;
 
     auto it = _context.offset_map().find(this->content_id());
-    if (it != _context.offset_map().end())
+    if (it != _context.offset_map().end()) {
+      stats::record<Vector>(stats::Metric::dedup_hits);
       return offset_type{it->second};
+    }
 
     const offset_type offset = builder_type::build(_context, *this);
     _context.offset_map()[this->content_id()] = offset.o;
@@ -686,6 +863,25 @@ private:
   accessor_type accessor_;
 };
 
+/*
+ * Builds vector of scalars, enums or structs in place, item values
+ * returned by generator are written directly to builder buffer.
+ * Generator is called with index of every item in order and
+ * must not use builder.
+ */
+
+template <typename T, typename F>
+const typename detail::vector::options_t<T>::offset_type
+build_vector(flatboobs::BuilderContext &_context, size_t _size,
+             F _generator) {
+
+  using V = detail::vector::options_t<T>;
+  static_assert(!is_table_v<typename V::value_type>,
+                "Tables should be built with Vector<T>::build");
+
+  return V::builder_type::build(_context, _size, _generator);
+}
+
 } // namespace flatboobs
 
 #endif // FLATBOOBS_VECTOR_HPP_
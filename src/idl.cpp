@@ -355,18 +355,33 @@ static void pydefine_EnumDef(py::module &m) {
       .def("is_union", [](fb::EnumDef &self) { return self.is_union; });
 }
 
+/*
+ * RPCCall
+ */
+
+static void pydefine_RPCCall(py::module &m) {
+  py::class_<fb::RPCCall, fb::Definition>(m, "RPCCall")
+      .def(py::init<>())
+      .def("__repr__",
+           [](const fb::RPCCall &self) {
+             return "<RPCCall: \"" + self.name + "\">";
+           })
+      .def_readonly("request", &fb::RPCCall::request, RETPOL_REFINT)
+      .def_readonly("response", &fb::RPCCall::response, RETPOL_REFINT);
+}
+
 /*
  * ServiceDef
  */
 
 static void pydefine_ServiceDef(py::module &m) {
-
-  // TODO implement services
   py::class_<fb::ServiceDef, fb::Definition>(m, "ServiceDef")
       .def(py::init<>())
-      .def("__repr__", [](const fb::ServiceDef &self) {
-        return "<ServiceDef: \"" + self.name + "\">";
-      });
+      .def("__repr__",
+           [](const fb::ServiceDef &self) {
+             return "<ServiceDef: \"" + self.name + "\">";
+           })
+      .def_readonly("calls", &fb::ServiceDef::calls, RETPOL_REFINT);
 }
 
 /*
@@ -525,7 +540,8 @@ PYBIND11_MODULE(idl, m) {
   pydefine_SymbolTable<fb::EnumDef>(m, "EnumDef");
 
   // RPCCall
-  // TODO
+  pydefine_RPCCall(m);
+  pydefine_SymbolTable<fb::RPCCall>(m, "RPCCall");
 
   // ServiceDef
   pydefine_ServiceDef(m);
@@ -0,0 +1,132 @@
+#define BOOST_TEST_MODULE Test message archive
+#include <boost/test/unit_test.hpp>
+#include <flatboobs/archive.hpp>
+#include <flatboobs_test_schema/vecofscalars.hpp>
+#include <sstream>
+
+using namespace flatboobs::schema::test;
+
+TestVecOfScalars sample(int32_t _n) {
+  return TestVecOfScalars{}.evolve(std::vector<int32_t>(_n % 50, _n),
+                                   std::vector<float>{float(_n)}, {}, {});
+}
+
+flatboobs::Message make_archive(size_t _count, size_t _block_size) {
+  std::ostringstream stream{};
+  flatboobs::ArchiveWriter writer{stream, _block_size, Z_BEST_SPEED, 4};
+  for (size_t i = 0; i < _count; i++) {
+    flatboobs::Message message = flatboobs::pack(sample(i));
+    if (i % 2)
+      BOOST_TEST(writer.append(message, "key" + std::to_string(i)) == i);
+    else
+      BOOST_TEST(writer.append(message) == i);
+  }
+  writer.close();
+  return flatboobs::Message{stream.str()};
+}
+
+BOOST_AUTO_TEST_CASE(test_empty) {
+  flatboobs::ArchiveReader reader{make_archive(0, 1024)};
+  BOOST_TEST(reader.empty());
+  BOOST_TEST(reader.block_count() == 0);
+  BOOST_CHECK_THROW(reader.at(0), std::out_of_range);
+}
+
+BOOST_AUTO_TEST_CASE(test_random_access) {
+  flatboobs::ArchiveReader reader{make_archive(500, 1024), 4, 2};
+  BOOST_TEST(reader.size() == 500);
+  BOOST_TEST(reader.block_count() > 10);
+
+  // Only block of requested message is decompressed
+  BOOST_TEST(flatboobs::unpack<TestVecOfScalars>(reader.at(321)) ==
+             sample(321));
+  BOOST_TEST(reader.decompressions() == 1);
+  BOOST_TEST(flatboobs::unpack<TestVecOfScalars>(reader[321]) == sample(321));
+  BOOST_TEST(reader.decompressions() == 1);
+
+  for (size_t i = 0; i < reader.size(); i += 7) {
+    flatboobs::Message message = reader.at(i);
+    BOOST_TEST(reinterpret_cast<uintptr_t>(message.data()) %
+                   sizeof(flatbuffers::largest_scalar_t) ==
+               0);
+    BOOST_TEST(flatboobs::unpack<TestVecOfScalars>(message) == sample(i));
+  }
+}
+
+BOOST_AUTO_TEST_CASE(test_keys) {
+  flatboobs::ArchiveReader reader{make_archive(100, 1024)};
+  BOOST_TEST(*reader.find("key33") == 33);
+  BOOST_TEST(!reader.find("key32"));
+  BOOST_TEST(flatboobs::unpack<TestVecOfScalars>(reader.at("key77")) ==
+             sample(77));
+  BOOST_CHECK_THROW(reader.at("missing"), flatboobs::key_error);
+}
+
+BOOST_AUTO_TEST_CASE(test_read_many) {
+  flatboobs::ArchiveReader reader{make_archive(500, 1024), 2, 4};
+  std::vector<size_t> ordinals{499, 0, 250, 1, 498, 250};
+  std::vector<flatboobs::Message> messages = reader.read(ordinals);
+  BOOST_TEST(messages.size() == ordinals.size());
+  for (size_t i = 0; i < ordinals.size(); i++)
+    BOOST_TEST(flatboobs::unpack<TestVecOfScalars>(messages[i]) ==
+               sample(ordinals[i]));
+  BOOST_TEST(reader.decompressions() == 3);
+}
+
+BOOST_AUTO_TEST_CASE(test_lru_eviction) {
+  flatboobs::ArchiveReader reader{make_archive(500, 1024), 1};
+  flatboobs::Message first = reader.at(0);
+  flatboobs::Message last = reader.at(499);
+  BOOST_TEST(reader.decompressions() == 2);
+
+  // Evicted block is still alive while message holds it
+  BOOST_TEST(flatboobs::unpack<TestVecOfScalars>(first) == sample(0));
+  reader.at(499);
+  BOOST_TEST(reader.decompressions() == 2);
+  reader.at(0);
+  BOOST_TEST(reader.decompressions() == 3);
+}
+
+BOOST_AUTO_TEST_CASE(test_malformed) {
+  BOOST_CHECK_THROW(flatboobs::ArchiveReader{flatboobs::Message{
+                        std::string{"not an archive"}}},
+                    flatboobs::archive_error);
+
+  std::string truncated{make_archive(10, 1024).str()};
+  truncated.erase(0, 8);
+  BOOST_CHECK_THROW(flatboobs::ArchiveReader{flatboobs::Message{truncated}},
+                    flatboobs::archive_error);
+}
+
+BOOST_AUTO_TEST_CASE(test_corrupted_index) {
+  const std::string archive{make_archive(10, 1024).str()};
+  const size_t index_offset = flatbuffers::ReadScalar<uint64_t>(
+      archive.data() + archive.size() - 3 * sizeof(uint64_t));
+  const size_t blocks = flatbuffers::ReadScalar<uint64_t>(
+      archive.data() + index_offset);
+
+  // Patches 64 bit value at index position
+  auto corrupted = [&archive, index_offset](size_t _pos, uint64_t _value) {
+    std::string data{archive};
+    flatbuffers::WriteScalar(&data[index_offset + _pos], _value);
+    return flatboobs::Message{std::move(data)};
+  };
+
+  // Block, message and key counts larger than index
+  BOOST_CHECK_THROW(flatboobs::ArchiveReader{corrupted(0, uint64_t(1) << 60)},
+                    flatboobs::archive_error);
+  const size_t messages_pos = sizeof(uint64_t) + blocks * 3 * sizeof(uint64_t);
+  BOOST_CHECK_THROW(
+      flatboobs::ArchiveReader{corrupted(messages_pos, uint64_t(1) << 60)},
+      flatboobs::archive_error);
+  const size_t keys_pos = messages_pos + sizeof(uint64_t) +
+                          10 * 3 * sizeof(uint64_t);
+  BOOST_CHECK_THROW(
+      flatboobs::ArchiveReader{corrupted(keys_pos, uint64_t(1) << 60)},
+      flatboobs::archive_error);
+
+  // Raw size of first block beyond zlib expansion bound
+  BOOST_CHECK_THROW(
+      flatboobs::ArchiveReader{corrupted(3 * sizeof(uint64_t), ~uint64_t(0))},
+      flatboobs::archive_error);
+}
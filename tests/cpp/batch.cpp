@@ -0,0 +1,73 @@
+#define BOOST_TEST_MODULE Test batch packing
+#include <boost/test/unit_test.hpp>
+#include <flatboobs_test_schema/vecofscalars.hpp>
+#include <flatboobs_test_schema/vecoftables.hpp>
+#include <list>
+
+using namespace flatboobs::schema::test;
+
+BOOST_AUTO_TEST_CASE(test_empty) {
+  flatboobs::MessageBatch batch =
+      flatboobs::pack_batch(std::vector<TestVecOfTables>{});
+  BOOST_TEST(batch.empty());
+  BOOST_TEST(batch.arena().size() == 0);
+}
+
+BOOST_AUTO_TEST_CASE(test_pack_unpack) {
+  std::vector<TestVecOfScalars> tables{};
+  for (int i = 0; i < 100; i++)
+    tables.push_back(TestVecOfScalars{}.evolve(
+        std::vector<int32_t>(i, i), {}, std::vector<bool>{i % 2 == 0}, {}));
+  tables.push_back(TestVecOfScalars{});
+
+  flatboobs::MessageBatch batch = flatboobs::pack_batch(tables);
+  BOOST_TEST(batch.size() == tables.size());
+
+  for (size_t i = 0; i < tables.size(); i++) {
+    flatboobs::Message message = batch[i];
+    BOOST_TEST(message.data() ==
+               batch.arena().data() + batch.index()[i].first);
+    BOOST_TEST(message.size() == batch.index()[i].second);
+    BOOST_TEST(flatboobs::unpack<TestVecOfScalars>(message) == tables[i]);
+  }
+
+  // Messages are laid out in order, first one spans whole arena
+  BOOST_TEST(batch.index()[0].first == 0);
+  BOOST_TEST(batch.index()[0].second == batch.arena().size());
+  for (size_t i = 1; i < batch.size(); i++)
+    BOOST_TEST(batch.index()[i].first > batch.index()[i - 1].first);
+}
+
+BOOST_AUTO_TEST_CASE(test_shared_dedup) {
+  std::vector<TestTable> items{};
+  for (int i = 0; i < 100; i++)
+    items.push_back(TestTable{}.evolve(i, i, TestEnum::Bar));
+  TestVecOfTables shared = TestVecOfTables{}.evolve(items);
+
+  std::list<TestVecOfTables> tables(10, shared);
+  flatboobs::MessageBatch batch = flatboobs::pack_batch(tables);
+  flatboobs::Message single = flatboobs::pack(shared);
+
+  BOOST_TEST(batch.size() == 10);
+  BOOST_TEST(batch.arena().size() < 2 * single.size());
+  for (size_t i = 0; i < batch.size(); i++)
+    BOOST_TEST(flatboobs::unpack<TestVecOfTables>(batch[i]) == shared);
+}
+
+BOOST_AUTO_TEST_CASE(test_restore) {
+  std::vector<TestVecOfScalars> tables{
+      TestVecOfScalars{}.evolve(std::vector<int32_t>{1, 2}, {}, {}, {}),
+      TestVecOfScalars{}.evolve({}, std::vector<float>{0.5}, {}, {})};
+  flatboobs::MessageBatch batch = flatboobs::pack_batch(tables);
+
+  // Receiver gets arena and index as separate buffers
+  std::string arena{batch.arena().str()};
+  flatboobs::MessageBatch restored{flatboobs::Message{std::move(arena)},
+                                   batch.index()};
+  BOOST_TEST(restored.size() == 2);
+  BOOST_TEST(flatboobs::unpack<TestVecOfScalars>(restored.at(1)) ==
+             tables[1]);
+  BOOST_CHECK_THROW(restored.at(2), std::out_of_range);
+  BOOST_CHECK_THROW(flatboobs::MessageBatch(batch.arena(), {{0, 1 << 20}}),
+                    std::out_of_range);
+}
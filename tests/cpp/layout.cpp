@@ -0,0 +1,40 @@
+#define BOOST_TEST_MODULE Test split source layout
+#include <boost/test/unit_test.hpp>
+#include <flatboobs_test_schema_split/enumflag.hpp>
+#include <flatboobs_test_schema_split/vecofstructs.hpp>
+#include <flatboobs_test_schema_split/vecoftables.hpp>
+
+using namespace flatboobs::schema::test;
+
+BOOST_AUTO_TEST_CASE(test_pack_unpack) {
+  TestTable item = TestTable{}.evolve(1, 2, TestEnum::Bar);
+  TestVecOfTables table =
+      TestVecOfTables{}.evolve(std::vector<TestTable>{item, TestTable{}});
+  auto result = flatboobs::unpack<TestVecOfTables>(flatboobs::pack(table));
+  BOOST_TEST(result == table);
+  BOOST_TEST(result.tables()[0] == item);
+}
+
+BOOST_AUTO_TEST_CASE(test_structs) {
+  TestStruct item{};
+  item.set_e(TestEnum::Buz);
+  TestVecOfStructs table =
+      TestVecOfStructs{}.evolve(std::vector<TestStruct>{item, item});
+  auto result = flatboobs::unpack<TestVecOfStructs>(flatboobs::pack(table));
+  BOOST_TEST(result == table);
+}
+
+BOOST_AUTO_TEST_CASE(test_enums) {
+  TestEnumAndFlag table = TestEnumAndFlag{}.evolve(
+      TestFlag::Foo | TestFlag::Buz, TestEnum::Bar);
+  auto result = flatboobs::unpack<TestEnumAndFlag>(flatboobs::pack(table));
+  BOOST_TEST(result == table);
+
+  std::vector<uint8_t> buffer{};
+  flatboobs::to_msgpack<TestEnumAndFlag>(flatboobs::pack(table), buffer);
+  auto msgpack_result =
+      flatboobs::unpack<TestEnumAndFlag>(flatboobs::from_msgpack<
+                                         TestEnumAndFlag>(
+          {reinterpret_cast<const char *>(buffer.data()), buffer.size()}));
+  BOOST_TEST(msgpack_result == table);
+}
@@ -0,0 +1,187 @@
+#define BOOST_TEST_MODULE Test MessagePack transcoding
+#include <boost/test/data/test_case.hpp>
+#include <boost/test/unit_test.hpp>
+#include <flatboobs_test_schema/nested.hpp>
+#include <flatboobs_test_schema/struct.hpp>
+#include <flatboobs_test_schema/vecofscalars.hpp>
+#include <flatboobs_test_schema/vecofstructs.hpp>
+#include <flatboobs_test_schema/vecoftables.hpp>
+
+namespace tt = boost::test_tools;
+
+using namespace flatboobs::schema::test;
+
+std::vector<TestVecOfTables> dataset() {
+  std::vector<TestVecOfTables> samples{};
+  samples.push_back(TestVecOfTables{});
+  for (int n = 0; n < 10; n++) {
+    std::vector<TestTable> items{};
+    for (int i = 0; i < n; i++)
+      items.push_back(TestTable{}.evolve(std::rand() % 0xff, i * 3.5,
+                                         i % 2 ? TestEnum::Foo
+                                               : TestEnum::Buz));
+    samples.push_back(TestVecOfTables{}.evolve(items));
+  }
+  return samples;
+}
+
+BOOST_AUTO_TEST_CASE(test_writer_reader) {
+  std::vector<uint8_t> buffer{};
+  flatboobs::msgpack::Writer writer{buffer};
+  writer.map(2);
+  writer.str("int");
+  writer.value(int32_t(-100000));
+  writer.str("vec");
+  writer.array(3);
+  writer.value(true);
+  writer.value(2.5f);
+  writer.value(TestEnum::Buz);
+
+  flatboobs::msgpack::Reader reader{buffer.data(), buffer.size()};
+  BOOST_TEST(reader.map() == 2);
+  BOOST_TEST(reader.str() == "int");
+  BOOST_TEST(reader.value<int64_t>() == -100000);
+  BOOST_TEST(reader.str() == "vec");
+  BOOST_TEST(reader.array() == 3);
+  BOOST_TEST(reader.value<bool>() == true);
+  BOOST_TEST(reader.value<double>() == 2.5);
+  BOOST_TEST((reader.value<TestEnum>() == TestEnum::Buz));
+  BOOST_TEST(reader.at_end());
+
+  flatboobs::msgpack::Reader skipping{buffer.data(), buffer.size()};
+  skipping.skip();
+  BOOST_TEST(skipping.at_end());
+}
+
+BOOST_AUTO_TEST_CASE(test_fixmap_encoding) {
+  TestTableRoot table{};
+  table = table.evolve(TestTable{}.evolve(1, 2, TestEnum::Foo));
+
+  std::vector<uint8_t> buffer{};
+  flatboobs::to_msgpack<TestTableRoot>(flatboobs::pack(table), buffer);
+
+  std::vector<uint8_t> expected{
+      0x81, 0xa5, 'v',  'a',  'l',  'u',  'e',  0x83, 0xa1, 'a', 0x01,
+      0xa1, 'b',  0xca, 0x40, 0x00, 0x00, 0x00, 0xa1, 'e',  0x00};
+  BOOST_TEST(buffer == expected, tt::per_element());
+}
+
+BOOST_DATA_TEST_CASE(test_round_trip, dataset()) {
+  std::vector<uint8_t> buffer{};
+  flatboobs::to_msgpack<TestVecOfTables>(flatboobs::pack(sample), buffer);
+
+  flatboobs::Message message = flatboobs::from_msgpack<TestVecOfTables>(
+      {reinterpret_cast<const char *>(buffer.data()), buffer.size()});
+  auto result = flatboobs::unpack<TestVecOfTables>(message);
+  BOOST_TEST(result == sample);
+}
+
+BOOST_AUTO_TEST_CASE(test_round_trip_vectors) {
+  TestVecOfScalars scalars{};
+  scalars = scalars.evolve(std::vector<int32_t>{1, -2, 300000},
+                           std::vector<float>{0.5, -1.5},
+                           std::vector<bool>{true, false, true},
+                           std::vector<TestEnum>{TestEnum::Buz});
+  TestVecOfStructs structs{};
+  structs = structs.evolve(std::vector<TestStruct>{
+      TestStruct{}, TestStruct{}.evolve(1, 2.5, TestEnum::Foo)});
+
+  std::vector<uint8_t> buffer{};
+  flatboobs::to_msgpack<TestVecOfScalars>(flatboobs::pack(scalars), buffer);
+  auto scalars_result =
+      flatboobs::unpack<TestVecOfScalars>(flatboobs::from_msgpack<
+                                          TestVecOfScalars>(
+          {reinterpret_cast<const char *>(buffer.data()), buffer.size()}));
+  BOOST_TEST(scalars_result == scalars);
+
+  flatboobs::to_msgpack<TestVecOfStructs>(flatboobs::pack(structs), buffer);
+  auto structs_result =
+      flatboobs::unpack<TestVecOfStructs>(flatboobs::from_msgpack<
+                                          TestVecOfStructs>(
+          {reinterpret_cast<const char *>(buffer.data()), buffer.size()}));
+  BOOST_TEST(structs_result == structs);
+}
+
+BOOST_AUTO_TEST_CASE(test_round_trip_nested) {
+  TestVecOfScalars scalars = TestVecOfScalars{}.evolve(
+      std::vector<int32_t>{1, 2, 3}, std::vector<float>{0.5}, {}, {});
+  flatboobs::Message nested_message = flatboobs::pack(scalars);
+
+  // Nested message is binary, but could be array of integers as well
+  std::vector<uint8_t> bin{};
+  flatboobs::to_msgpack<TestNested>(
+      flatboobs::pack(TestNested{}.evolve(
+          flatboobs::nested_flatbuffer(nested_message), {})),
+      bin);
+  std::vector<uint8_t> array{};
+  flatboobs::msgpack::Writer writer{array};
+  writer.map(1);
+  writer.str("scalars");
+  writer.array(nested_message.size());
+  for (size_t i = 0; i < nested_message.size(); i++)
+    writer.value(uint8_t(nested_message.data()[i]));
+
+  for (const auto &buffer : {bin, array}) {
+    flatboobs::Message message = flatboobs::from_msgpack<TestNested>(
+        {reinterpret_cast<const char *>(buffer.data()), buffer.size()});
+    TestVecOfScalars result =
+        flatboobs::unpack<TestNested>(message).scalars_nested_root();
+    BOOST_TEST(result == scalars);
+    BOOST_TEST((result.source_message()->data() - message.data()) %
+                   sizeof(flatbuffers::largest_scalar_t) ==
+               0);
+  }
+}
+
+BOOST_AUTO_TEST_CASE(test_unknown_and_nil_keys) {
+  std::vector<uint8_t> buffer{};
+  flatboobs::msgpack::Writer writer{buffer};
+  writer.map(3);
+  writer.str("unknown");
+  writer.array(2);
+  writer.str("skip me");
+  writer.value(42);
+  writer.str("value");
+  writer.map(1);
+  writer.str("b");
+  writer.value(7.0);
+  writer.str("other");
+  writer.nil();
+
+  auto result =
+      flatboobs::unpack<TestTableRoot>(flatboobs::from_msgpack<TestTableRoot>(
+          {reinterpret_cast<const char *>(buffer.data()), buffer.size()}));
+  BOOST_TEST(result.value().a() == 10);
+  BOOST_TEST(result.value().b() == 7.0);
+  BOOST_TEST((result.value().e() == TestEnum::Bar));
+}
+
+BOOST_AUTO_TEST_CASE(test_malformed_lengths) {
+  // {"tables": array of 0x7fffffff items} without items
+  std::vector<uint8_t> buffer{0x81, 0xa6, 't', 'a', 'b', 'l', 'e', 's',
+                              0xdd, 0x7f, 0xff, 0xff, 0xff};
+  BOOST_CHECK_THROW(flatboobs::from_msgpack<TestVecOfTables>(
+                        {reinterpret_cast<const char *>(buffer.data()),
+                         buffer.size()}),
+                    flatboobs::unpack_error);
+
+  std::vector<uint8_t> map{0xdf, 0x00, 0x00, 0x00, 0x02, 0xc0, 0xc0};
+  flatboobs::msgpack::Reader reader{map.data(), map.size()};
+  BOOST_CHECK_THROW(reader.map(), flatboobs::unpack_error);
+}
+
+BOOST_AUTO_TEST_CASE(test_integer_range) {
+  std::vector<uint8_t> buffer{};
+  flatboobs::msgpack::Writer writer{buffer};
+  writer.value(300);
+  writer.value(-200);
+  writer.value(UINT64_MAX);
+  writer.value(UINT64_MAX);
+
+  flatboobs::msgpack::Reader reader{buffer.data(), buffer.size()};
+  BOOST_CHECK_THROW(reader.value<uint8_t>(), flatboobs::unpack_error);
+  BOOST_CHECK_THROW(reader.value<int8_t>(), flatboobs::unpack_error);
+  BOOST_CHECK_THROW(reader.value<int64_t>(), flatboobs::unpack_error);
+  BOOST_TEST(reader.value<uint64_t>() == UINT64_MAX);
+  BOOST_TEST(reader.at_end());
+}
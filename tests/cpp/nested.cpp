@@ -0,0 +1,115 @@
+#define BOOST_TEST_MODULE Test nested flatbuffers
+#include <boost/test/unit_test.hpp>
+#include <flatboobs_test_schema/nested.hpp>
+
+using namespace flatboobs::schema::test;
+
+TestVecOfScalars scalars_sample() {
+  return TestVecOfScalars{}.evolve(std::vector<int32_t>{1, 2, 3},
+                                   std::vector<float>{0.5, 1.5},
+                                   std::vector<bool>{true, false}, {});
+}
+
+BOOST_AUTO_TEST_CASE(test_defaults) {
+  TestNested table{};
+  BOOST_TEST(table.scalars().empty());
+  BOOST_TEST(table.scalars_nested_root() == TestVecOfScalars{});
+  BOOST_TEST(table.root_nested_root() == TestTableRoot{});
+}
+
+BOOST_AUTO_TEST_CASE(test_embed_message) {
+  flatboobs::Message message = flatboobs::pack(scalars_sample());
+  flatboobs::Vector<uint8_t> bytes = flatboobs::nested_flatbuffer(message);
+
+  // No copy until parent is packed
+  BOOST_TEST(bytes.size() == message.size());
+  BOOST_TEST(reinterpret_cast<const std::byte *>(bytes.data()) ==
+             message.data());
+
+  TestNested table = TestNested{}.evolve(bytes, {});
+  BOOST_TEST(table.scalars_nested_root() == scalars_sample());
+}
+
+BOOST_AUTO_TEST_CASE(test_embed_table) {
+  flatboobs::Message message = flatboobs::pack(scalars_sample());
+  TestVecOfScalars unpacked =
+      flatboobs::unpack<TestVecOfScalars>(message);
+
+  // Table unpacked from message root is not re-serialized
+  flatboobs::Vector<uint8_t> bytes = flatboobs::nested_flatbuffer(unpacked);
+  BOOST_TEST(reinterpret_cast<const std::byte *>(bytes.data()) ==
+             message.data());
+
+  TestTableRoot root{TestTable{}.evolve(1, 2, TestEnum::Buz)};
+  TestNested table = TestNested{}.evolve(
+      flatboobs::nested_flatbuffer(scalars_sample()),
+      flatboobs::nested_flatbuffer(root));
+  BOOST_TEST(table.scalars_nested_root() == scalars_sample());
+  BOOST_TEST(table.root_nested_root() == root);
+}
+
+BOOST_AUTO_TEST_CASE(test_pack_unpack) {
+  TestNested table = TestNested{}.evolve(
+      flatboobs::nested_flatbuffer(scalars_sample()), {});
+
+  TestVecOfScalars nested{};
+  {
+    flatboobs::Message message = flatboobs::pack(table);
+    TestNested result = flatboobs::unpack<TestNested>(message);
+    BOOST_TEST(result == table);
+    BOOST_TEST(result.root().empty());
+
+    nested = result.scalars_nested_root();
+    const flatboobs::Message *source = nested.source_message();
+    BOOST_TEST(source->data() > message.data());
+    BOOST_TEST(source->data() < message.data() + message.size());
+    BOOST_TEST((source->data() - message.data()) %
+                   sizeof(flatbuffers::largest_scalar_t) ==
+               0);
+
+    // Root is unpacked once and shared by following calls
+    BOOST_TEST(result.scalars_nested_root().content_id() ==
+               nested.content_id());
+  }
+  // Nested root keeps parent message alive
+  BOOST_TEST(nested == scalars_sample());
+}
+
+BOOST_AUTO_TEST_CASE(test_lazy_verification) {
+  std::vector<uint8_t> garbage(64, 0xff);
+  TestNested table = TestNested{}.evolve(garbage, {});
+
+  flatboobs::Message message = flatboobs::pack(table);
+  TestNested result = flatboobs::unpack<TestNested>(message);
+  BOOST_TEST(result.scalars() == garbage);
+  BOOST_CHECK_THROW(result.scalars_nested_root(), flatboobs::unpack_error);
+  BOOST_CHECK_THROW(result.scalars_nested_root(), flatboobs::unpack_error);
+}
+
+BOOST_AUTO_TEST_CASE(test_dedup) {
+  flatboobs::Vector<uint8_t> bytes =
+      flatboobs::nested_flatbuffer(scalars_sample());
+  TestNested table = TestNested{}.evolve(bytes, {});
+  TestNested twice = TestNested{}.evolve(bytes, bytes);
+
+  flatboobs::Message message = flatboobs::pack(table);
+  flatboobs::Message message_twice = flatboobs::pack(twice);
+  BOOST_TEST(message_twice.size() < message.size() + bytes.size());
+}
+
+BOOST_AUTO_TEST_CASE(test_dedup_aligned_only) {
+  flatboobs::Vector<uint8_t> bytes =
+      flatboobs::nested_flatbuffer(scalars_sample());
+  flatbuffers::FlatBufferBuilder fbb{};
+  flatboobs::BuilderContext context{&fbb};
+
+  // Plain vector of the same bytes is not reused, it could be unaligned
+  fbb.PushElement(uint8_t(0));
+  auto plain = bytes.build(context);
+  auto nested = flatboobs::build_nested_flatbuffer(context, bytes);
+  BOOST_TEST(nested.o != plain.o);
+  BOOST_TEST((nested.o - sizeof(flatbuffers::uoffset_t)) %
+                 sizeof(flatbuffers::largest_scalar_t) ==
+             0);
+  BOOST_TEST(flatboobs::build_nested_flatbuffer(context, bytes).o == nested.o);
+}
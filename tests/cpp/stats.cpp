@@ -0,0 +1,125 @@
+#define BOOST_TEST_MODULE Test pack / unpack statistics
+#include <boost/test/unit_test.hpp>
+#include <flatboobs_test_schema_stats/vecofscalars.hpp>
+#include <flatboobs_test_schema_stats/vecoftables.hpp>
+
+using namespace flatboobs::schema::test;
+using flatboobs::stats::Metric;
+
+static_assert(flatboobs::stats::enabled);
+
+using Samples = std::vector<flatboobs::stats::Sample>;
+
+void collect(const flatboobs::stats::Sample &_sample,
+             void *_samples) noexcept {
+  static_cast<Samples *>(_samples)->push_back(_sample);
+}
+
+BOOST_AUTO_TEST_CASE(test_histogram) {
+  using flatboobs::stats::Histogram;
+  BOOST_TEST(Histogram::bucket(0) == 0);
+  BOOST_TEST(Histogram::bucket(1) == 1);
+  BOOST_TEST(Histogram::bucket(3) == 2);
+  BOOST_TEST(Histogram::bucket(1024) == 11);
+  BOOST_TEST(Histogram::bucket(~uint64_t(0)) == 64);
+
+  Histogram histogram{};
+  for (uint64_t value : {1, 2, 3, 100, 1000})
+    histogram.record(value);
+  BOOST_TEST(histogram.count() == 5);
+  BOOST_TEST(histogram.sum() == 1106);
+  BOOST_TEST(histogram.at(2) == 2);
+  BOOST_TEST(histogram.quantile(0.5) == 3);
+  BOOST_TEST(histogram.quantile(1.0) == 1023);
+}
+
+BOOST_AUTO_TEST_CASE(test_pack_counters) {
+  flatboobs::stats::reset();
+  auto &root = flatboobs::stats::type_stats<TestVecOfTables>();
+  auto &item = flatboobs::stats::type_stats<TestTable>();
+
+  TestTable shared = TestTable{}.evolve(1, 2, TestEnum::Foo);
+  TestVecOfTables table = TestVecOfTables{}.evolve(
+      std::vector<TestTable>{shared, TestTable{}.evolve(3, 4, {}), shared});
+  flatboobs::Message message = flatboobs::pack(table);
+
+  BOOST_TEST(root.counter(Metric::packs) == 1);
+  BOOST_TEST(root.counter(Metric::builds) == 1);
+  BOOST_TEST(item.counter(Metric::builds) == 2);
+  BOOST_TEST(item.counter(Metric::dedup_hits) == 1);
+  BOOST_TEST(root.histogram(Metric::pack_time_ns).count() == 1);
+  BOOST_TEST(root.histogram(Metric::message_size).sum() == message.size());
+
+  // Packing of unchanged unpacked table returns source message
+  flatboobs::pack(flatboobs::unpack<TestVecOfTables>(message));
+  BOOST_TEST(root.counter(Metric::packs) == 2);
+  BOOST_TEST(root.histogram(Metric::pack_time_ns).count() == 1);
+}
+
+BOOST_AUTO_TEST_CASE(test_vector_dedup_hits) {
+  flatboobs::stats::reset();
+  auto &stats = flatboobs::stats::type_stats<flatboobs::Vector<int32_t>>();
+  BOOST_TEST(stats.type_name() == "flatboobs.Vector");
+
+  flatboobs::Vector<int32_t> ints{std::vector<int32_t>{1, 2, 3}};
+  std::vector<TestVecOfScalars> tables{
+      TestVecOfScalars{}.evolve(ints, {}, {}, {}),
+      TestVecOfScalars{}.evolve(ints, std::vector<float>{1.5f}, {}, {})};
+  flatboobs::pack_batch(tables);
+
+  BOOST_TEST(stats.counter(Metric::dedup_hits) == 1);
+}
+
+BOOST_AUTO_TEST_CASE(test_reallocations) {
+  flatboobs::stats::reset();
+  auto &stats = flatboobs::stats::type_stats<TestVecOfScalars>();
+
+  flatboobs::pack(TestVecOfScalars{});
+  BOOST_TEST(stats.counter(Metric::reallocations) == 0);
+
+  flatboobs::pack(TestVecOfScalars{}.evolve(std::vector<int32_t>(10000, 1),
+                                            {}, {}, {}));
+  BOOST_TEST(stats.counter(Metric::reallocations) > 0);
+}
+
+BOOST_AUTO_TEST_CASE(test_unpack_counters) {
+  flatboobs::stats::reset();
+  auto &stats = flatboobs::stats::type_stats<TestVecOfTables>();
+
+  flatboobs::Message message = flatboobs::pack(TestVecOfTables{});
+  flatboobs::unpack<TestVecOfTables>(message);
+  BOOST_CHECK_THROW(
+      flatboobs::unpack<TestVecOfTables>(flatboobs::pack(TestVecOfScalars{})),
+      flatboobs::unpack_error);
+
+  BOOST_TEST(stats.counter(Metric::unpacks) == 2);
+  BOOST_TEST(stats.counter(Metric::verify_failures) == 1);
+  BOOST_TEST(stats.histogram(Metric::verify_time_ns).count() == 2);
+}
+
+BOOST_AUTO_TEST_CASE(test_callback) {
+  flatboobs::stats::reset();
+  Samples samples{};
+  Samples other{};
+  flatboobs::stats::set_callback(collect, &samples);
+  flatboobs::pack(TestVecOfScalars{});
+  flatboobs::stats::set_callback(collect, &other);
+  flatboobs::pack(TestVecOfScalars{});
+  flatboobs::stats::set_callback(nullptr);
+  flatboobs::pack(TestVecOfScalars{});
+
+  // packs, builds, reallocations, message_size, pack_time_ns
+  BOOST_TEST(samples.size() == 5);
+  BOOST_TEST(other.size() == 5);
+  BOOST_TEST(samples[0].type_name == TestVecOfScalars::fully_qualified_name());
+  BOOST_TEST((samples[0].metric == Metric::packs));
+  BOOST_TEST((samples.back().metric == Metric::pack_time_ns));
+
+  std::vector<std::string_view> names{};
+  flatboobs::stats::for_each([&names](const flatboobs::stats::TypeStats &_x) {
+    names.push_back(_x.type_name());
+  });
+  BOOST_TEST((std::find(names.begin(), names.end(),
+                        TestVecOfScalars::fully_qualified_name()) !=
+              names.end()));
+}
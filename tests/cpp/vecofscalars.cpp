@@ -2,6 +2,7 @@
 #include <boost/test/unit_test.hpp>
 // #include <flatboobs/utils.hpp>
 #include <flatboobs_test_schema/vecofscalars.hpp>
+#include <list>
 // #include <iostream>
 
 using namespace flatboobs::schema::test;
@@ -106,3 +107,68 @@ BOOST_AUTO_TEST_CASE_TEMPLATE(test_pack_unpack, T, test_types) {
   // std::cout << table << std::endl;
   // flatboobs::hexdump(std::cout, message.str());
 }
+
+BOOST_AUTO_TEST_CASE_TEMPLATE(test_bulk_construct, T, test_types) {
+
+  DataSet<T> src{};
+
+  std::list<T> items(src.a.begin(), src.a.end());
+  flatboobs::Vector<T> vec_range{items.begin(), items.end()};
+  flatboobs::Vector<T> vec_generated{src.a.size(),
+                                     [&src](size_t i) { return src.a[i]; }};
+
+  BOOST_TEST(vec_range == src.a);
+  BOOST_TEST(vec_generated == src.a);
+  BOOST_TEST(flatboobs::Vector<T>(0, [](size_t) { return T{}; }).empty());
+}
+
+BOOST_AUTO_TEST_CASE_TEMPLATE(test_construct_from_data, T,
+                              test_types_with_data_access) {
+
+  DataSet<T> src{};
+
+  flatboobs::Vector<T> vec_a{src.a.data(), src.a.size()};
+  BOOST_TEST(vec_a == src.a);
+  BOOST_TEST(vec_a.str() ==
+             std::string_view(reinterpret_cast<const char *>(src.a.data()),
+                              src.a.size() * sizeof(T)));
+
+  // Vector owns its copy, source could go away
+  BOOST_TEST(static_cast<const void *>(vec_a.data()) !=
+             static_cast<const void *>(src.a.data()));
+
+  // View is not copied until it is built
+  flatboobs::Vector<T> view{flatboobs::view, src.a.data(), src.a.size()};
+  BOOST_TEST(view == src.a);
+  BOOST_TEST(static_cast<const void *>(view.data()) ==
+             static_cast<const void *>(src.a.data()));
+  flatbuffers::FlatBufferBuilder fbb{};
+  flatboobs::BuilderContext context{&fbb};
+  auto built = flatbuffers::GetTemporaryPointer(fbb, view.build(context));
+  BOOST_TEST(std::string_view(reinterpret_cast<const char *>(built->Data()),
+                              built->size() * sizeof(T)) == view.str());
+}
+
+BOOST_AUTO_TEST_CASE(test_build_vector) {
+  flatbuffers::FlatBufferBuilder fbb{};
+  flatboobs::BuilderContext context{&fbb};
+
+  auto ints = flatbuffers::GetTemporaryPointer(
+      fbb, flatboobs::build_vector<int32_t>(
+               context, 1000, [](size_t i) { return int32_t(i * i); }));
+  BOOST_TEST(ints->size() == 1000);
+  BOOST_TEST(ints->Get(999) == 999 * 999);
+
+  auto bools = flatbuffers::GetTemporaryPointer(
+      fbb, flatboobs::build_vector<bool>(
+               context, 3, [](size_t i) { return i % 2 == 0; }));
+  BOOST_TEST(bools->size() == 3);
+  BOOST_TEST(bools->Get(0) == 1);
+  BOOST_TEST(bools->Get(1) == 0);
+
+  auto enums = flatbuffers::GetTemporaryPointer(
+      fbb, flatboobs::build_vector<TestEnum>(
+               context, 2, [](size_t) { return TestEnum::Buz; }));
+  BOOST_TEST(enums->size() == 2);
+  BOOST_TEST((TestEnum(enums->Get(1)) == TestEnum::Buz));
+}
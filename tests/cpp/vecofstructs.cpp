@@ -57,3 +57,32 @@ BOOST_DATA_TEST_CASE(test_pack_unpack, dataset()) {
   BOOST_TEST(result == table);
   // flatboobs::hexdump(std::cout, message.str());
 }
+
+BOOST_DATA_TEST_CASE(test_bulk_construct, dataset()) {
+  std::vector<TestStruct> items(sample.begin(), sample.end());
+  flatboobs::Vector<TestStruct> vec_data{items.data(), items.size()};
+  flatboobs::Vector<TestStruct> vec_generated{
+      sample.size(), [&sample](size_t i) { return sample[i]; }};
+  BOOST_TEST(vec_data == sample);
+  BOOST_TEST(vec_generated == sample);
+  BOOST_TEST((items.empty() || vec_data.data() != items.data()));
+
+  flatboobs::Vector<TestStruct> vec_view{flatboobs::view, items.data(),
+                                         items.size()};
+  BOOST_TEST(vec_view.data() == items.data());
+  auto result = flatboobs::unpack<TestVecOfStructs>(
+      flatboobs::pack(TestVecOfStructs{}.evolve(vec_view)));
+  BOOST_TEST(result.structs() == sample);
+}
+
+BOOST_DATA_TEST_CASE(test_build_vector, dataset()) {
+  flatbuffers::FlatBufferBuilder fbb{};
+  flatboobs::BuilderContext context{&fbb};
+  auto structs = flatbuffers::GetTemporaryPointer(
+      fbb, flatboobs::build_vector<TestStruct>(
+               context, sample.size(),
+               [&sample](size_t i) { return sample[i]; }));
+  BOOST_TEST(structs->size() == sample.size());
+  for (size_t i = 0; i < sample.size(); i++)
+    BOOST_TEST(*structs->Get(i) == sample[i]);
+}
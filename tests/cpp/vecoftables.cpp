@@ -53,3 +53,23 @@ BOOST_DATA_TEST_CASE(test_pack_unpack, dataset()) {
   BOOST_TEST(result == table);
   /// flatboobs::hexdump(std::cout, message.str());
 }
+
+BOOST_AUTO_TEST_CASE(test_default_items) {
+  TestTable item = TestTable{}.evolve(1, 2, TestEnum::Bar);
+  flatboobs::Vector<TestTable> items{
+      4, [&item](size_t i) { return i % 2 ? item : TestTable{}; }};
+  TestVecOfTables table = TestVecOfTables{}.evolve(items);
+  auto result = flatboobs::unpack<TestVecOfTables>(flatboobs::pack(table));
+  BOOST_TEST(result.tables().size() == 4);
+  BOOST_TEST(result.tables()[0] == TestTable{});
+  BOOST_TEST(result.tables()[1] == item);
+  BOOST_TEST(result.tables()[2] == TestTable{});
+  BOOST_TEST(result.tables()[3] == item);
+}
+
+BOOST_AUTO_TEST_CASE(test_range_construct) {
+  std::vector<TestTable> src{TestTable{}.evolve(1, {}, {}),
+                             TestTable{}.evolve(2, {}, {})};
+  flatboobs::Vector<TestTable> items{src.begin(), src.end()};
+  BOOST_TEST(items == src);
+}
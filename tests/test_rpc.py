@@ -0,0 +1,250 @@
+# pylint: disable=missing-docstring
+import asyncio
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from flatboobs import rpc
+
+SCHEMA_DIR = Path(__file__).parent.parent / 'schema' / 'test'
+
+ECHO = rpc.method_id("test.Echo")
+FAIL = rpc.method_id("test.Fail")
+CRASH = rpc.method_id("test.Crash")
+
+
+class EchoServicer:
+
+    def __init__(self):
+        self.concurrent = 0
+        self.max_concurrent = 0
+
+    async def echo(self, request):
+        self.concurrent += 1
+        self.max_concurrent = max(self.max_concurrent, self.concurrent)
+        await asyncio.sleep(0.001)
+        self.concurrent -= 1
+        return bytes(memoryview(request))[::-1]
+
+    async def fail(self, request):
+        raise rpc.RPCError("bad request")
+
+    async def crash(self, request):
+        raise ValueError("secret details")
+
+    def rpc_handlers(self):
+        return {ECHO: self.echo, FAIL: self.fail, CRASH: self.crash}
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_method_id():
+    assert rpc.method_id("") == 0x811c9dc5
+    assert rpc.method_id("a") == 0xe40c292c
+    assert rpc.method_id("test.Echo") != rpc.method_id("test.Fail")
+
+
+def test_pipelining_over_unix_socket(tmp_path):
+    path = str(tmp_path / 'rpc.sock')
+    servicer = EchoServicer()
+
+    async def main():
+        async with rpc.Server(servicer) as server:
+            await server.start(path)
+            async with rpc.Client(path, pool_size=2) as client:
+                requests = [f'request {i}'.encode() for i in range(200)]
+                responses = await asyncio.gather(
+                    *(client.call(ECHO, x) for x in requests))
+                assert [bytes(memoryview(x)) for x in responses] == [
+                    x[::-1] for x in requests]
+                assert len(client._channels) <= 2
+
+    run(main())
+    assert servicer.max_concurrent > 1
+
+
+def test_error_and_unknown_method(tmp_path):
+    path = str(tmp_path / 'rpc.sock')
+
+    async def main():
+        async with rpc.Server(EchoServicer()) as server:
+            await server.start(path)
+            async with rpc.Client(path) as client:
+                with pytest.raises(rpc.RPCError, match="bad request"):
+                    await client.call(FAIL, b'')
+                with pytest.raises(rpc.RPCError, match="Unknown method"):
+                    await client.call(12345, b'')
+                with pytest.raises(rpc.RPCError) as info:
+                    await client.call(CRASH, b'')
+                assert str(info.value) == rpc.INTERNAL_ERROR
+                response = await client.call(ECHO, b'ok')
+                assert bytes(memoryview(response)) == b'ko'
+
+    run(main())
+
+
+def test_max_concurrency(tmp_path):
+    path = str(tmp_path / 'rpc.sock')
+    servicer = EchoServicer()
+
+    async def main():
+        async with rpc.Server(servicer, max_concurrency=3) as server:
+            await server.start(path)
+            async with rpc.Client(path, pool_size=2) as client:
+                responses = await asyncio.gather(
+                    *(client.call(ECHO, b'%d' % i) for i in range(50)))
+                assert len(responses) == 50
+
+    run(main())
+    assert servicer.max_concurrent == 3
+
+
+class FakeTransport:
+
+    def __init__(self):
+        self.frames = []
+        self.reading = True
+
+    def writelines(self, data):
+        self.frames.append(b''.join(data))
+
+    def pause_reading(self):
+        self.reading = False
+
+    def resume_reading(self):
+        self.reading = True
+
+    def is_closing(self):
+        return False
+
+
+def test_max_concurrency_within_chunk():
+    entered = 0
+    release = None
+
+    async def hang(request):
+        nonlocal entered
+        entered += 1
+        await release.wait()
+        return request
+
+    async def main():
+        nonlocal release
+        release = asyncio.Event()
+        transport = FakeTransport()
+        protocol = rpc.ServerProtocol(
+            {ECHO: hang}, asyncio.Semaphore(100), max_concurrency=3)
+        protocol.connection_made(transport)
+
+        # All frames arrive in one chunk
+        protocol.data_received(b''.join(
+            rpc.encode_header(1, i, ECHO, rpc.KIND_REQUEST) + b'x'
+            for i in range(10)))
+        await asyncio.sleep(0.01)
+        assert entered == 3
+        assert not transport.reading
+
+        release.set()
+        for _ in range(100):
+            if len(transport.frames) == 10:
+                break
+            await asyncio.sleep(0.01)
+        assert entered == 10
+        assert len(transport.frames) == 10
+        assert transport.reading
+
+    run(main())
+
+
+def test_oversized_frame_closes_connection(tmp_path):
+    path = str(tmp_path / 'rpc.sock')
+
+    async def main():
+        async with rpc.Server(EchoServicer()) as server:
+            await server.start(path)
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(b'\xff\xff\xff\xff')
+            assert await asyncio.wait_for(reader.read(), 5) == b''
+            writer.close()
+
+    run(main())
+
+
+def test_handlers_cancelled_on_disconnect(tmp_path):
+    path = str(tmp_path / 'rpc.sock')
+    started = None
+    cancelled = None
+
+    async def hang(request):
+        started.set()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    class Servicer:
+        def rpc_handlers(self):
+            return {ECHO: hang}
+
+    async def main():
+        nonlocal started, cancelled
+        started, cancelled = asyncio.Event(), asyncio.Event()
+        async with rpc.Server(Servicer()) as server:
+            await server.start(path)
+            client = rpc.Client(path)
+            call = asyncio.ensure_future(client.call(ECHO, b''))
+            await asyncio.wait_for(started.wait(), 5)
+            await client.close()
+            await asyncio.wait_for(cancelled.wait(), 5)
+            with pytest.raises(ConnectionError):
+                await call
+
+    run(main())
+
+
+def test_large_frames_over_tcp():
+    payload = bytes(range(256)) * 8192
+
+    async def main():
+        async with rpc.Server(EchoServicer()) as server:
+            await server.start(('127.0.0.1', 0))
+            port = server.sockets[0].getsockname()[1]
+            async with rpc.Client(('127.0.0.1', port)) as client:
+                responses = await asyncio.gather(
+                    client.call(ECHO, payload), client.call(ECHO, b'x'))
+                assert bytes(memoryview(responses[0])) == payload[::-1]
+                assert bytes(memoryview(responses[1])) == b'x'
+
+    run(main())
+
+
+def test_generated_stubs(tmp_path):
+    from flatboobs.codegen.generate_rpc import generate_rpc
+
+    generate_rpc([SCHEMA_DIR / 'rpc.fbs'], [], tmp_path, options={})
+    spec = importlib.util.spec_from_file_location(
+        'rpc_rpc', str(tmp_path / 'rpc_rpc.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    class Servicer(module.TestServiceServicer):
+        async def Double(self, request):
+            return bytes(memoryview(request)) * 2
+
+    path = str(tmp_path / 'rpc.sock')
+
+    async def main():
+        async with rpc.Server(Servicer()) as server:
+            await server.start(path)
+            async with rpc.Client(path) as client:
+                stub = module.TestServiceStub(client)
+                response = await stub.Double(b'ab')
+                assert bytes(memoryview(response)) == b'abab'
+                with pytest.raises(rpc.RPCError):
+                    await stub.Fail(b'')
+
+    run(main())